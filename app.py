@@ -9,10 +9,18 @@ Features:
 - Retro minimalist design
 """
 
+import os
+import threading
+import time
 import streamlit as st
-from chatbot_engine import ChatbotEngine
+from chatbot_engine import ChatbotEngine, get_groq_api_key, prewarm_llm_cache, should_prewarm_llm_cache
+from chat_transcript import add_message, message_html, render_transcript, reset_transcript
+from floating_icons import get_floating_icons_html
 from ticket_generator import get_qr_bytes, get_ticket_bytes
 
+# Script run timing; see record_run_stats below
+run_started = time.perf_counter()
+
 # Page configuration
 st.set_page_config(
     page_title="TicketBot - Event Ticketing Chatbot",
@@ -478,43 +486,39 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Add floating retro icons
-import base64
-import os
-
-def get_image_base64(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
-icons_folder = "icons new"
-icon_files = [
-    "books.jpeg",
-    "download (1).jpeg", 
-    "download (2).jpeg",
-    "Download premium png of PNG Retro cassette tape illustration_ by Hein about music png, cassett tape halftone, vintage paper background, vintage cassette tape illustration, and background 17874012.jpeg",
-    "Download premium png of PNG Vintage monochrome globe illustration by Hein about globe, retro world map, world, background, and png 17873929.jpeg",
-    "download.jpeg"
-]
+# Add floating retro icons (downscaled and cached once per process)
+st.markdown(get_floating_icons_html(), unsafe_allow_html=True)
 
-# Create floating icons HTML - 12 icons spread around, using images in varied order
-icon_order = [0, 3, 1, 4, 2, 5, 2, 0, 4, 1, 5, 3]  # Varied order to avoid same icons near each other
-floating_icons_html = ""
-for i, icon_idx in enumerate(icon_order):
-    icon_path = os.path.join(icons_folder, icon_files[icon_idx])
-    if os.path.exists(icon_path):
-        img_base64 = get_image_base64(icon_path)
-        floating_icons_html += f'<img src="data:image/jpeg;base64,{img_base64}" class="floating-icon icon-{i+1}" />'
+# Warm the LLM response cache once per server process, off the request path
+@st.cache_resource
+def start_llm_cache_prewarm():
+    if not get_groq_api_key() or not should_prewarm_llm_cache():
+        return None
+    thread = threading.Thread(target=prewarm_llm_cache, name="llm-cache-prewarm", daemon=True)
+    thread.start()
+    return thread
 
-st.markdown(floating_icons_html, unsafe_allow_html=True)
+start_llm_cache_prewarm()
 
 # Initialize session state
 if 'chatbot' not in st.session_state:
     st.session_state.chatbot = ChatbotEngine()
-    st.session_state.messages = []
+    reset_transcript()
     st.session_state.show_ticket = False
+    # Script runs and their duration, to check that a turn costs exactly one run
+    # (runs_at_last_turn starts at 1: the first page load is not part of a turn)
+    st.session_state.run_stats = {"runs": 0, "turns": 0, "runs_at_last_turn": 1, "runs_per_turn": None, "last_run_ms": None, "last_turn_ms": None}
     
-    greeting = st.session_state.chatbot.get_greeting()
-    st.session_state.messages.append({"role": "bot", "content": greeting})
+    add_message("bot", st.session_state.chatbot.get_greeting())
+
+st.session_state.run_stats["runs"] += 1
+
+def start_new_chat():
+    """Reset the conversation; runs as a callback so the click costs a single script run"""
+    st.session_state.chatbot.reset()
+    reset_transcript()
+    st.session_state.show_ticket = False
+    add_message("bot", st.session_state.chatbot.get_greeting())
 
 # Header
 st.markdown("""
@@ -563,13 +567,7 @@ with st.sidebar:
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    if st.button("Start New Chat"):
-        st.session_state.chatbot.reset()
-        st.session_state.messages = []
-        st.session_state.show_ticket = False
-        greeting = st.session_state.chatbot.get_greeting()
-        st.session_state.messages.append({"role": "bot", "content": greeting})
-        st.rerun()
+    st.button("Start New Chat", on_click=start_new_chat)
 
 # Chat container
 st.markdown("""
@@ -582,18 +580,26 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Display chat messages
+# Chat input (always pinned to the bottom of the page, wherever it is called)
+user_input = st.chat_input("Type your message here...", key="chat_input")
+
+# Display chat messages; a new message is answered in this same script run
 chat_container = st.container()
 with chat_container:
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            st.markdown(f'<div class="chat-message-user">{message["content"]}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="chat-message-bot">{message["content"].replace(chr(10), "<br>")}</div>', unsafe_allow_html=True)
-    
-    # Show typing indicator if processing
-    if st.session_state.get('is_thinking', False):
-        st.markdown('<div class="typing-indicator"><span></span><span></span><span></span></div>', unsafe_allow_html=True)
+    # Past messages: cached HTML, latest page only, in a fragment
+    render_transcript(len(st.session_state.messages))
+    
+    if user_input:
+        st.markdown(add_message("user", user_input)["html"], unsafe_allow_html=True)
+        
+        # Typing indicator until the first chunk arrives; the reply streams into the same slot
+        reply_placeholder = st.empty()
+        reply_placeholder.markdown('<div class="typing-indicator"><span></span><span></span><span></span></div>', unsafe_allow_html=True)
+        response = ""
+        for chunk in st.session_state.chatbot.process_message_stream(user_input):
+            response += chunk
+            reply_placeholder.markdown(message_html("bot", response), unsafe_allow_html=True)
+        add_message("bot", response)
 
 # Show QR ticket if booking is complete
 if st.session_state.chatbot.state == "booking_complete":
@@ -632,21 +638,6 @@ if st.session_state.chatbot.state == "booking_complete":
                 use_container_width=True
             )
 
-# Chat input
-user_input = st.chat_input("Type your message here...", key="chat_input")
-
-if user_input:
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    st.session_state.is_thinking = True
-    st.rerun()
-
-# Process message after showing typing indicator
-if st.session_state.get('is_thinking', False):
-    response = st.session_state.chatbot.process_message(st.session_state.messages[-1]["content"])
-    st.session_state.messages.append({"role": "bot", "content": response})
-    st.session_state.is_thinking = False
-    st.rerun()
-
 # Footer
 st.markdown("""
 <div class="footer-text">
@@ -654,3 +645,17 @@ st.markdown("""
     2026 TicketBot
 </div>
 """, unsafe_allow_html=True)
+
+def record_run_stats(turn):
+    """Update the per-session run counters; set TICKETBOT_RUN_STATS=1 to print them"""
+    stats = st.session_state.run_stats
+    stats["last_run_ms"] = (time.perf_counter() - run_started) * 1000
+    if turn:
+        stats["turns"] += 1
+        stats["runs_per_turn"] = stats["runs"] - stats["runs_at_last_turn"]
+        stats["runs_at_last_turn"] = stats["runs"]
+        stats["last_turn_ms"] = stats["last_run_ms"]
+    if os.environ.get("TICKETBOT_RUN_STATS") == "1":
+        print(f"Script run {stats['runs']}: {stats['last_run_ms']:.1f} ms" + (f", turn {stats['turns']} took {stats['runs_per_turn']} run(s)" if turn else ""))
+
+record_run_stats(bool(user_input))
@@ -0,0 +1,85 @@
+"""
+Benchmark - load time and memory of a 1M event catalog file
+Writes a synthetic catalog as JSON Lines, compiles it with event_store, then
+loads each file in a fresh interpreter: read the events, build the catalog
+as the server does (EventCatalog indexes, BM25 index, rank arrays), then
+play a first conversation up to the mood match, with seat stock and the
+system prompt the LLM would get. Reports wall time per step and resident
+memory split into heap (anonymous) and mapped file pages. The compiled
+catalog leaves names, venues and descriptions in the file, so only the
+shown events' text is ever decoded.
+
+Run from the repository root (needs about 1 GB of temporary disk at 1M):
+    python -m benchmarks.bench_catalog_load [events]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import iter_events
+from event_store import compile_catalog, read_jsonl
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import contextlib, io, sys, time
+start = time.perf_counter()
+import events_data
+from chatbot_engine import ChatbotEngine
+from event_store import load_events
+imported = time.perf_counter()
+events = load_events(sys.argv[1])
+loaded = time.perf_counter()
+events_data.EVENTS[:] = events
+events_data.mark_catalog_changed()
+events_data.get_catalog()
+indexed = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):  # no API key: fallback replies, and a warning
+    engine = ChatbotEngine(fast_path=True)
+    engine.process_message("Sam")
+    engine.process_message("I'm feeling happy and curious")
+shown = [(e.name, e.venue, e.description, e.price) for e in engine.current_events]
+engine._build_messages("I'm feeling happy and curious")
+turned = time.perf_counter()
+status = dict(line.split(":", 1) for line in open("/proc/self/status"))
+kb = lambda key: int(status.get(key, "0 kB").split()[0])
+print(loaded - imported, indexed - loaded, turned - indexed, kb("VmRSS"), kb("RssAnon"), kb("RssFile"), len(shown))
+"""
+
+
+def load_in_child(path, directory):
+    env = dict(os.environ, TICKETBOT_EVENTS_FILE="", TICKETBOT_CATALOG_POLL_SECONDS="0", GROQ_API_KEY="",
+               TICKETBOT_INVENTORY_DB=os.path.join(directory, f"inventory-{os.path.basename(path)}.db"))
+    result = subprocess.run([sys.executable, "-c", CHILD, path], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    load, index, turn, rss, anon, mapped, shown = result.stdout.split()
+    assert int(shown) == 6
+    return float(load), float(index), float(turn), int(rss) / 1024, int(anon) / 1024, int(mapped) / 1024
+
+
+def main(count=1_000_000):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "events.jsonl")
+        compiled = os.path.join(directory, "events.tcat")
+        with open(source, "w", encoding="utf-8") as file:
+            for row in iter_events(count):
+                file.write(json.dumps(row) + "\n")
+
+        start = time.perf_counter()
+        compile_catalog(read_jsonl(source), compiled)
+        compile_seconds = time.perf_counter() - start
+
+        mb = 1024 * 1024
+        print(f"{count} events; JSON Lines {os.path.getsize(source) / mb:.0f} MB, compiled {os.path.getsize(compiled) / mb:.0f} MB "
+              f"(compile took {compile_seconds:.1f} s)")
+        print(f"{'':<16}{'load s':>8}{'index s':>9}{'first turn s':>14}{'RSS MB':>9}{'heap MB':>9}{'mapped MB':>11}")
+        for label, path in (("JSON Lines", source), ("compiled, mmap", compiled)):
+            load, index, turn, rss, anon, mapped = load_in_child(path, directory)
+            print(f"{label:<16}{load:>8.2f}{index:>9.2f}{turn:>14.2f}{rss:>9.0f}{anon:>9.0f}{mapped:>11.0f}")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
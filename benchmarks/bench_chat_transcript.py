@@ -0,0 +1,71 @@
+"""
+Benchmark - Streamlit rerun time against transcript length
+Times reruns of the legacy per-message transcript loop, of the cached, paged
+transcript, and of the whole app, at several conversation lengths.
+
+Run from the repository root:
+    python -m benchmarks.bench_chat_transcript [sizes...]
+"""
+
+import os
+import sys
+import timeit
+
+from streamlit.testing.v1 import AppTest
+
+from chat_transcript import message_html
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+RERUNS = 10
+
+BOT_REPLY = "\n".join(
+    f"{i}. Event number {i}\n   2026-04-0{i} at 7:00 PM\n   The Blue Note Lounge\n   $25.00 | 80 seats\n" for i in range(1, 7)
+) + "\nWhich event interests you? (Enter the number)"
+
+
+def make_messages(count):
+    messages = []
+    for i in range(count):
+        role, content = ("user", "I'm feeling happy") if i % 2 else ("bot", BOT_REPLY)
+        messages.append({"id": i, "role": role, "content": content, "html": message_html(role, content)})
+    return messages
+
+
+def legacy_transcript():
+    """The original app.py loop, kept here as the baseline"""
+    import streamlit as st
+    for message in st.session_state.messages:
+        if message["role"] == "user":
+            st.markdown(f'<div class="chat-message-user">{message["content"]}</div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="chat-message-bot">{message["content"].replace(chr(10), "<br>")}</div>', unsafe_allow_html=True)
+
+
+def paged_transcript():
+    import streamlit as st
+    from chat_transcript import render_transcript
+    render_transcript(len(st.session_state.messages))
+
+
+def time_reruns(app, messages):
+    app.session_state["messages"] = messages
+    app.run()
+    sent = sum(len(element.value) for element in app.markdown)
+    return timeit.timeit(app.run, number=RERUNS) / RERUNS, sent
+
+
+def main(sizes=(10, 100, 1000)):
+    print(f"{'messages':>9}{'legacy ms':>11}{'legacy KB':>11}{'paged ms':>10}{'paged KB':>10}{'full app ms':>13}")
+    for size in sizes:
+        messages = make_messages(size)
+        legacy_time, legacy_sent = time_reruns(AppTest.from_function(legacy_transcript), messages)
+        paged_time, paged_sent = time_reruns(AppTest.from_function(paged_transcript), messages)
+        app = AppTest.from_file(APP_PATH, default_timeout=60)
+        app.run()
+        app_time, _ = time_reruns(app, messages)
+        print(f"{size:>9}{legacy_time * 1000:>11.1f}{legacy_sent / 1024:>11.1f}{paged_time * 1000:>10.1f}"
+              f"{paged_sent / 1024:>10.1f}{app_time * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 1000))
@@ -0,0 +1,53 @@
+"""
+Benchmark - mood/category/date lookups on large synthetic catalogs
+Compares the legacy linear scan in get_events_by_mood against EventCatalog indexes.
+
+Run from the repository root:
+    python -m benchmarks.bench_event_catalog [sizes...]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic import make_events
+from events_data import EventCatalog, MOODS
+
+
+def legacy_events_by_mood(events, mood):
+    """The original get_events_by_mood scan, kept here as the baseline"""
+    matching_events = []
+    for event in events:
+        if mood in event["mood"]:
+            matching_events.append(event)
+    return matching_events[:6]
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    print(f"{'events':>10}{'build s':>10}{'legacy us':>12}{'index us':>12}{'rank3 us':>12}{'category us':>13}{'date us':>10}")
+    for size in sizes:
+        events = make_events(size)
+
+        start = time.perf_counter()
+        catalog = EventCatalog(events)
+        build = time.perf_counter() - start
+
+        queries = MOODS[:20]
+        legacy = per_query_us(lambda mood: legacy_events_by_mood(events, mood), queries[:5])
+        indexed = per_query_us(lambda mood: catalog.events_for_mood(mood, limit=6), queries)
+        ranked = per_query_us(lambda mood: catalog.rank_by_moods([(mood, 2), ("happy", 1), ("social", 1)]), queries)
+        category = per_query_us(lambda c: catalog.events_for_category(c, limit=6), ["music", "art", "food"])
+        on_date = per_query_us(lambda d: catalog.events_on(d, limit=6), ["2026-03-15", "2026-06-01"])
+
+        print(f"{size:>10}{build:>10.2f}{legacy:>12.1f}{indexed:>12.1f}{ranked:>12.1f}{category:>13.1f}{on_date:>10.1f}")
+        del events, catalog
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,83 @@
+"""
+Benchmark - memory of a large event catalog shared by many sessions
+Compares dict rows with Event records for the same events, parsed from JSON
+as a loaded catalog would be (so no strings are shared by accident), then
+measures sessions that have browsed and picked an event. Sessions hold
+event ids only, so their size does not depend on the catalog.
+
+Run from the repository root:
+    python -m benchmarks.bench_event_memory [events] [sessions]
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import events_data
+from benchmarks.synthetic import make_events
+from chatbot_engine import ChatbotEngine
+from events_data import Event, EventCatalog
+from inventory import SeatInventory
+from llm_cache import LLMResponseCache
+
+SESSION_SCRIPT = ["Sam", "I'm feeling happy and curious", "2"]
+
+
+def measure(build):
+    """(result, bytes still allocated by build once it returns)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def start_session(inventory, llm_cache):
+    engine = ChatbotEngine(inventory=inventory, llm_cache=llm_cache, fast_path=True)
+    engine.groq_client = None  # fallback replies only; no network calls
+    for message in SESSION_SCRIPT:
+        engine._plan_response(message)
+    return engine
+
+
+def main(count=100000, sessions=1000):
+    payload = json.dumps(make_events(count))
+
+    rows, rows_bytes = measure(lambda: json.loads(payload))
+    del rows
+    records, records_bytes = measure(lambda: [Event.from_dict(row) for row in json.loads(payload)])
+    catalog, index_bytes = measure(lambda: EventCatalog(records))  # shares the records, adds the lookup tables
+
+    original = list(events_data.EVENTS)
+    events_data.EVENTS[:] = records
+    events_data.mark_catalog_changed()
+    inventory = SeatInventory(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+    inventory.seed(records)
+    llm_cache = LLMResponseCache()
+    with contextlib.redirect_stdout(io.StringIO()):  # without an API key each engine prints a warning
+        start_session(inventory, llm_cache)  # build the retrieval index and prompt caches outside the measurement
+        engines, sessions_bytes = measure(lambda: [start_session(inventory, llm_cache) for _ in range(sessions)])
+    assert all(engine.state == "ticket_count" for engine in engines)
+    events_data.EVENTS[:] = original
+    events_data.mark_catalog_changed()
+
+    mb = 1024 * 1024
+    print(f"{count} events parsed from JSON, {sessions} sessions")
+    print(f"{'':<28}{'MB':>8}{'bytes/event':>13}")
+    print(f"{'dict rows':<28}{rows_bytes / mb:>8.1f}{rows_bytes / count:>13.0f}")
+    print(f"{'Event records':<28}{records_bytes / mb:>8.1f}{records_bytes / count:>13.0f}")
+    print(f"{'catalog lookup tables':<28}{index_bytes / mb:>8.1f}{index_bytes / count:>13.0f}")
+    print(f"{'sessions':<28}{sessions_bytes / mb:>8.1f}{sessions_bytes / sessions:>13.0f} bytes/session")
+    print(f"Per session event state: {len(engines[0].current_event_ids)} listed ids + selected id "
+          f"{engines[0].user_data['selected_event_id']}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
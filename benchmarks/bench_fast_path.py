@@ -0,0 +1,79 @@
+"""
+Benchmark - conversation latency and LLM calls per booking, with and without fast path mode
+Plays the same booking conversation (including a few invalid inputs) through
+ChatbotEngine against a local mock Groq server and reports per-turn latency
+and how many completions each booking cost.
+
+Run from the repository root:
+    python -m benchmarks.bench_fast_path [conversations] [mock_latency_ms]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_groq import MockGroqServer
+
+# Engines pick up the key and endpoint from the environment, like in production
+os.environ["GROQ_API_KEY"] = "mock"
+
+from chatbot_engine import ChatbotEngine, prewarm_llm_cache
+from inventory import SeatInventory
+from llm_cache import LLMResponseCache
+
+SCRIPT = ["Sam", "I'm feeling happy", "99", "1", "twenty", "2", "not an email", "sam@example.com", "no"]
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def run(conversations, server, inventory, fast_path, cache):
+    turn_times = []
+    conversation_times = []
+    requests_before = server.requests
+    for _ in range(conversations):
+        engine = ChatbotEngine(inventory=inventory, fast_path=fast_path)
+        engine.llm_cache = cache
+        start = time.perf_counter()
+        engine.get_greeting()
+        turn_times.append(time.perf_counter() - start)
+        for message in SCRIPT:
+            turn_start = time.perf_counter()
+            engine.process_message(message)
+            turn_times.append(time.perf_counter() - turn_start)
+        conversation_times.append(time.perf_counter() - start)
+        assert engine.state == "ended", engine.state
+    calls = (server.requests - requests_before) / conversations
+    return turn_times, conversation_times, calls
+
+
+def main(conversations=20, latency_ms=300):
+    server = MockGroqServer(latency=latency_ms / 1000).start_in_thread()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    inventory = SeatInventory(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+    inventory.seed([{"id": i, "available_seats": 10 ** 6} for i in range(1, 21)])
+
+    warm_cache = LLMResponseCache(variants=1)
+    prewarm_llm_cache(ChatbotEngine(inventory=inventory, llm_cache=warm_cache, fast_path=False), delay=0)
+
+    modes = [
+        ("llm every turn", False, None),
+        ("fast path", True, None),
+        ("fast path + warm cache", True, warm_cache),
+    ]
+    print(f"{conversations} conversations x {len(SCRIPT) + 1} turns, mock LLM latency {latency_ms} ms")
+    print(f"{'mode':<24}{'LLM calls/booking':>19}{'turn p50 ms':>13}{'turn p95 ms':>13}{'booking s':>11}")
+    for label, fast_path, cache in modes:
+        turns, bookings, calls = run(conversations, server, inventory, fast_path, cache)
+        print(f"{label:<24}{calls:>19.1f}{percentile(turns, 0.5) * 1000:>13.1f}"
+              f"{percentile(turns, 0.95) * 1000:>13.1f}{statistics.mean(bookings):>11.2f}")
+
+    server.stop_in_thread()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""
+Benchmark - floating icon payload per Streamlit rerun
+Compares the legacy per-rerun read + base64 of the full-size icon JPEGs with
+the downscaled icons cached once per process (inline and static serving),
+then times full app reruns with Streamlit's AppTest.
+
+Run from the repository root:
+    python -m benchmarks.bench_floating_icons [reruns]
+"""
+
+import base64
+import os
+import sys
+import timeit
+
+import floating_icons
+from floating_icons import ICON_FILES, ICON_ORDER, ICONS_FOLDER, build_floating_icons_html, icon_mtimes
+
+
+def legacy_floating_icons_html():
+    """The original app.py loop, kept here as the baseline"""
+    html = ""
+    for i, icon_idx in enumerate(ICON_ORDER):
+        path = os.path.join(ICONS_FOLDER, ICON_FILES[icon_idx])
+        if os.path.exists(path):
+            with open(path, "rb") as img_file:
+                img_base64 = base64.b64encode(img_file.read()).decode()
+            html += f'<img src="data:image/jpeg;base64,{img_base64}" class="floating-icon icon-{i+1}" />'
+    return html
+
+
+def static_icon_bytes():
+    folder = floating_icons.STATIC_ICONS_FOLDER
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+
+def main(reruns=50):
+    legacy_time = timeit.timeit(legacy_floating_icons_html, number=reruns) / reruns
+    legacy_bytes = len(legacy_floating_icons_html())
+
+    cache = {}
+
+    def cached(static_serving):
+        # What every rerun pays after the first: stat the files, hit the cache
+        key = (icon_mtimes(), static_serving)
+        if key not in cache:
+            cache[key] = build_floating_icons_html(*key)
+        return cache[key]
+
+    print(f"{'icons':<22}{'build ms':>10}{'per rerun ms':>14}{'bytes per rerun':>17}")
+    print(f"{'legacy (every rerun)':<22}{legacy_time * 1000:>10.1f}{legacy_time * 1000:>14.2f}{legacy_bytes:>17}")
+    for label, static_serving in (("inline, cached", False), ("static, cached", True)):
+        build = timeit.timeit(lambda: build_floating_icons_html(icon_mtimes(), static_serving), number=1)
+        cached(static_serving)
+        per_rerun = timeit.timeit(lambda: cached(static_serving), number=reruns) / reruns
+        print(f"{label:<22}{build * 1000:>10.1f}{per_rerun * 1000:>14.2f}{len(cached(static_serving)):>17}")
+    print(f"Static serving: {static_icon_bytes()} bytes of icon files fetched once, then from the browser cache")
+
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(os.path.dirname(floating_icons.__file__), "app.py"), default_timeout=60)
+    app.run()
+    rerun_time = timeit.timeit(app.run, number=reruns) / reruns
+    print(f"Full app.py rerun (AppTest): {rerun_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
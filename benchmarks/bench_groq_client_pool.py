@@ -0,0 +1,72 @@
+"""
+Benchmark - per-session Groq clients versus the shared client pool
+New sessions arrive one after another and make a few LLM calls each against a
+local mock HTTPS endpoint. With a client per session every session pays for
+SSL context setup and a TCP + TLS handshake on its first call; the shared
+client reuses warm keep-alive connections.
+
+Run from the repository root:
+    python -m benchmarks.bench_groq_client_pool [sessions] [calls_per_session] [mock_latency_ms]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_groq import MockGroqServer, make_self_signed_tls
+
+import chatbot_engine
+from chatbot_engine import GROQ_MODEL, make_groq_client
+from groq import Groq
+
+
+def call(client):
+    start = time.perf_counter()
+    client.chat.completions.create(model=GROQ_MODEL, messages=[{"role": "user", "content": "hi"}], max_tokens=5)
+    return time.perf_counter() - start
+
+
+def run(new_session_client, sessions, calls):
+    setup, first, steady = [], [], []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        client = new_session_client()
+        setup.append(time.perf_counter() - start)
+        first.append(call(client))
+        steady.extend(call(client) for _ in range(calls - 1))
+    return setup, first, steady
+
+
+def ms(samples):
+    return statistics.mean(samples) * 1000
+
+
+def main(sessions=50, calls=5, latency_ms=20):
+    context, cert = make_self_signed_tls(tempfile.mkdtemp())
+    os.environ["SSL_CERT_FILE"] = cert  # httpx trusts the mock certificate through the environment
+    server = MockGroqServer(latency=latency_ms / 1000, ssl_context=context).start_in_thread()
+    os.environ["GROQ_API_KEY"] = "mock"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+
+    shared = make_groq_client("mock", server.base_url)
+    call(shared)  # the process-wide client is already warm when later sessions start
+    chatbot_engine._groq_client = shared
+
+    modes = [
+        ("client per session", lambda: Groq(api_key="mock", base_url=server.base_url)),
+        ("shared client", chatbot_engine.get_groq_client),
+    ]
+    print(f"{sessions} new sessions x {calls} calls over HTTPS, mock latency {latency_ms} ms")
+    print(f"{'':<20}{'setup ms':>10}{'first call ms':>15}{'steady call ms':>16}{'connections':>13}")
+    for label, new_session_client in modes:
+        connections_before = server.connections
+        setup, first, steady = run(new_session_client, sessions, calls)
+        print(f"{label:<20}{ms(setup):>10.2f}{ms(first):>15.2f}{ms(steady):>16.2f}{server.connections - connections_before:>13}")
+
+    server.stop_in_thread()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""
+Benchmark - memory held by conversation history in long sessions
+Runs sessions of repeated bookings (no LLM, template replies) and reports the
+resident memory each session adds, with the old unbounded list and with the
+token-budgeted ConversationHistory. Each mode runs in a fresh process.
+
+Run from the repository root:
+    python -m benchmarks.bench_history_memory [turns] [sessions]
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# Repeats "book another" so the session (and its history) never resets
+CYCLE = ["I'm feeling happy", "1", "1", "sam@example.com", "yes"]
+
+
+def rss_bytes():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def run_sessions(mode, turns, sessions):
+    os.environ["GROQ_API_KEY"] = "unused"  # clients are created but never called
+    from chatbot_engine import ChatbotEngine
+    from inventory import SeatInventory
+
+    inventory = SeatInventory(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+    inventory.seed([{"id": i, "available_seats": 10 ** 9} for i in range(1, 21)])
+    # Warm imports, caches and the SQLite connection before measuring
+    warm = ChatbotEngine(inventory=inventory, fast_path=True)
+    warm.groq_client = None
+    for message in ["Sam"] + CYCLE:
+        warm.process_message(message)
+
+    gc.collect()
+    before = rss_bytes()
+    engines = []
+    for _ in range(sessions):
+        engine = ChatbotEngine(inventory=inventory, fast_path=True)
+        engine.groq_client = None
+        if mode == "list":
+            engine.conversation_history = []  # the previous unbounded store
+        engine.process_message("Sam")
+        for turn in range(turns - 1):
+            engine.process_message(CYCLE[turn % len(CYCLE)])
+        engines.append(engine)
+    gc.collect()
+    after = rss_bytes()
+    history = engines[0].conversation_history
+    retained_chars = sum(len(message["content"]) for message in history)
+    return (after - before) / sessions, len(history), retained_chars
+
+
+def main(turns=1000, sessions=20):
+    print(f"{sessions} sessions x {turns} turns (user + bot message per turn)")
+    print(f"{'history':<14}{'RSS per session KB':>20}{'messages kept':>15}{'chars kept':>12}")
+    context = multiprocessing.get_context("spawn")
+    for mode in ("list", "token budget"):
+        with context.Pool(1) as pool:
+            per_session, kept, chars = pool.apply(run_sessions, (mode, turns, sessions))
+        print(f"{mode:<14}{per_session / 1024:>20.1f}{kept:>15}{chars:>12}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
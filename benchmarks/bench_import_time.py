@@ -0,0 +1,74 @@
+"""
+Benchmark - startup import time of the app's own modules
+Imports what app.py imports in a fresh interpreter under -X importtime and
+adds up the cumulative time of the project modules (streamlit is reported
+separately: the app pays for it either way). Fails (exit code 1) if that
+total goes over the budget, or if a module that should load on first use
+(the Groq SDK, the ticket rendering stack, requests) is imported at startup.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time [runs]
+"""
+
+import os
+import subprocess
+import sys
+
+APP_MODULES = ("chatbot_engine", "chat_transcript", "floating_icons", "ticket_generator")
+DEFERRED_MODULES = ("groq", "httpx", "qrcode", "PIL", "requests")
+
+# Best-of-runs milliseconds for APP_MODULES once streamlit is loaded
+IMPORT_BUDGET_MS = float(os.environ.get("TICKETBOT_IMPORT_BUDGET_MS", "80"))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(statement):
+    """{module: cumulative ms} for top-level imports, plus every module name loaded"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    top_level, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return top_level, loaded
+
+
+def best_of(runs, statement):
+    samples = [import_times(statement) for _ in range(runs)]
+    times = {name: min(sample[0].get(name, 0.0) for sample in samples) for name in samples[0][0]}
+    return times, samples[0][1]
+
+
+def main(runs=5):
+    import_times("import streamlit; import " + ", ".join(APP_MODULES))  # write bytecode caches first
+    times, loaded = best_of(runs, "import streamlit; import " + ", ".join(APP_MODULES))
+    deferred, _ = best_of(runs, "import streamlit; import groq, qrcode, PIL.Image, PIL.ImageDraw, requests")
+
+    app_ms = sum(times.get(name, 0.0) for name in APP_MODULES)
+    print(f"Best of {runs} runs, -X importtime cumulative ms")
+    print(f"{'streamlit':<20}{times.get('streamlit', 0.0):>8.1f}  (not counted)")
+    for name in APP_MODULES:
+        print(f"{name:<20}{times.get(name, 0.0):>8.1f}")
+    print(f"{'app modules':<20}{app_ms:>8.1f}  budget {IMPORT_BUDGET_MS:.0f}")
+    print(f"{'deferred to use':<20}{sum(ms for name, ms in deferred.items() if name != 'streamlit'):>8.1f}  "
+          f"({', '.join(DEFERRED_MODULES)})")
+
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        sys.exit(1)
+    if app_ms > IMPORT_BUDGET_MS:
+        print(f"FAIL: app modules take {app_ms:.1f} ms to import, over the {IMPORT_BUDGET_MS:.0f} ms budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,85 @@
+"""
+Benchmark - mood detection over a synthetic corpus of user utterances
+Compares the legacy nested substring scan against the precompiled matcher.
+
+Run from the repository root:
+    python -m benchmarks.bench_mood_detection
+"""
+
+import random
+import time
+
+from chatbot_engine import MOOD_KEYWORDS, detect_moods
+
+TEMPLATES = [
+    "I'm feeling {kw} today",
+    "honestly pretty {kw}, maybe a bit {kw2}",
+    "not sure, kind of {kw} I guess",
+    "{kw}!!",
+    "work has been a lot lately so I am {kw} and {kw2}",
+    "can you show me the display of events to follow",
+    "I want to go somewhere tonight with my friends",
+    "meh",
+]
+FILLER = ["really", "so", "just", "super", "a little", "kinda", "very"]
+
+
+def legacy_detect_mood(text):
+    """The original detect_mood, kept here as the baseline"""
+    text_lower = text.lower()
+    for mood, keywords in MOOD_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                return mood
+    return None
+
+
+def build_corpus(size, seed=7):
+    rng = random.Random(seed)
+    keywords = [k for words in MOOD_KEYWORDS.values() for k in words]
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        text = template.format(kw=f"{rng.choice(FILLER)} {rng.choice(keywords)}", kw2=rng.choice(keywords))
+        corpus.append(text)
+    return corpus
+
+
+def time_it(fn, corpus, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, corpus):
+    legacy = time_it(legacy_detect_mood, corpus)
+    matcher = time_it(detect_moods, corpus)
+    size = len(corpus)
+    print(f"{label}: {size} utterances, avg {sum(map(len, corpus)) / size:.0f} chars")
+    print(f"  {'legacy':10}{legacy / size * 1e6:>10.2f} us/utterance (first hit only)")
+    print(f"  {'matcher':10}{matcher / size * 1e6:>10.2f} us/utterance (all moods, scored)")
+    print(f"  Speedup: {legacy / matcher:.1f}x")
+
+
+def main(size=5000):
+    corpus = build_corpus(size)
+    # Paragraph-length messages: legacy cost grows with keywords x length, the matcher with length
+    paragraphs = [" ".join(corpus[i:i + 5]) for i in range(0, size, 5)]
+    misses = [text for text in corpus if not detect_moods(text)]
+
+    report("Short messages", corpus)
+    report("Paragraphs", paragraphs)
+    report("No mood present", misses)
+
+    disagreements = sorted({t for t in corpus if legacy_detect_mood(t) != (detect_moods(t)[0][0] if detect_moods(t) else None)})
+    print(f"Top mood differs on {len(disagreements)} distinct utterances, e.g.:")
+    for text in disagreements[:5]:
+        print(f"  {text!r}: legacy={legacy_detect_mood(text)} matcher={detect_moods(text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark - ranking a large catalog against a user's detected moods
+Scores every event by popcount(event moods & user moods) plus seat and date
+bonuses, and keeps the top k. Compares the NumPy ranker (masks in one array,
+argpartition for the top k) with the posting-list ranker it replaces on
+large catalogs, and with the old first-6-matches lookup. The live-seats row
+rescores with seat counts from a dict (a third of events sold out) the way
+the chatbot does with the seat inventory. Fails (exit code 1)
+if the NumPy ranker's median is over the budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_mood_rank [events] [queries]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+import events_data
+from benchmarks.synthetic import iter_events
+from events_data import EventCatalog, MOODS
+
+RANK_BUDGET_MS = float(os.environ.get("TICKETBOT_RANK_BUDGET_MS", "10"))
+TODAY = date(2026, 5, 1)
+
+
+def make_queries(count, seed=7):
+    """Detected moods as (mood, score) pairs: one to three moods per message"""
+    rng = random.Random(seed)
+    return [[(mood, 1) for mood in rng.sample(MOODS, rng.randint(1, 3))] for _ in range(count)]
+
+
+def timings_ms(rank, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        rank(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main(count=1_000_000, queries=200):
+    start = time.perf_counter()
+    catalog = EventCatalog(iter_events(count))
+    build = time.perf_counter() - start
+    queries = make_queries(queries)
+
+    if not events_data.HAS_NUMPY:
+        print("NumPy is not installed; only the posting-list ranker is available")
+        sys.exit(1)
+    events_data.VECTOR_RANK_MIN_EVENTS = 0
+    start = time.perf_counter()
+    catalog.rank_by_moods(queries[0], today=TODAY)  # builds the arrays and the bonus for TODAY
+    columns = time.perf_counter() - start
+    vectorized = timings_ms(lambda query: catalog.rank_by_moods(query, today=TODAY), queries)
+    vector_top = [[event.id for event in catalog.rank_by_moods(query, today=TODAY)] for query in queries[:20]]
+    rng = random.Random(3)
+    left = {event.id: 0 if rng.random() < 1 / 3 else rng.randint(0, event.available_seats) for event in catalog.events}
+    live = timings_ms(
+        lambda query: catalog.rank_by_moods(query, today=TODAY, seats=lambda ids: {i: left[i] for i in ids}), queries
+    )
+
+    catalog._columns = None
+    events_data.VECTOR_RANK_MIN_EVENTS = sys.maxsize
+    postings = timings_ms(lambda query: catalog.rank_by_moods(query, today=TODAY), queries[:20])
+    posting_top = [[event.id for event in catalog.rank_by_moods(query, today=TODAY)] for query in queries[:20]]
+    first_six = timings_ms(lambda query: catalog.events_for_mood(query[0][0], limit=6), queries)
+
+    print(f"{count} events (catalog built in {build:.1f} s), {len(queries)} queries of 1-3 moods, top 6")
+    print(f"{'':<30}{'p50 ms':>9}{'p95 ms':>9}")
+    print(f"{'NumPy, argpartition':<30}{vectorized[0]:>9.2f}{vectorized[1]:>9.2f}  "
+          f"(arrays built on first use in {columns * 1000:.0f} ms)")
+    print(f"{'NumPy, live seats':<30}{live[0]:>9.2f}{live[1]:>9.2f}")
+    print(f"{'posting lists, heapq':<30}{postings[0]:>9.2f}{postings[1]:>9.2f}")
+    print(f"{'first 6 matches (unranked)':<30}{first_six[0]:>9.3f}{first_six[1]:>9.3f}")
+    print(f"Same top 6 from both rankers: {vector_top == posting_top}")
+
+    if vector_top != posting_top:
+        print("FAIL: the rankers disagree")
+        sys.exit(1)
+    if vectorized[0] > RANK_BUDGET_MS:
+        print(f"FAIL: median ranking takes {vectorized[0]:.2f} ms, over the {RANK_BUDGET_MS:.0f} ms budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,85 @@
+"""
+Benchmark - system prompt tokens per LLM call versus catalog size
+Plays a booking conversation against synthetic catalogs of growing size and
+compares the prompts actually sent (relevant events only) with the old
+full-catalog prompt. Tokens are estimated at about 4 characters each.
+
+Run from the repository root:
+    python -m benchmarks.bench_prompt_tokens [sizes...]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+os.environ["GROQ_API_KEY"] = "unused"  # replaced by RecordingClient below
+
+import events_data
+from benchmarks.synthetic import make_events
+from chatbot_engine import SYSTEM_PROMPT_TEMPLATE, ChatbotEngine, serialize_events_for_prompt
+from conversation_history import estimate_tokens
+from event_retrieval import get_event_index
+from inventory import SeatInventory
+
+SCRIPT = ["Sam", "I'm feeling excited, any live music?", "99", "1", "2", "sam@example.com", "no"]
+
+
+class RecordingClient:
+    """Stands in for the Groq client and records each request's system prompt"""
+
+    def __init__(self):
+        self.system_prompts = []
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, messages, stream=False, **kwargs):
+        self.system_prompts.append(messages[0]["content"])
+        if stream:  # prefetched replies are streamed
+            return iter([types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content="OK."))])])
+        message = types.SimpleNamespace(content="OK.")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def run(events):
+    events_data.EVENTS[:] = events
+    events_data.mark_catalog_changed()
+    start = time.perf_counter()
+    events = events_data.get_catalog().events  # dict rows become Event records; the BM25 index is built here too
+    get_event_index()
+    index_seconds = time.perf_counter() - start
+
+    inventory = SeatInventory(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+    inventory.seed(events)
+    engine = ChatbotEngine(inventory=inventory, fast_path=False)
+    engine.llm_cache = None  # every turn builds its own prompt
+    engine.groq_client = client = RecordingClient()
+
+    start = time.perf_counter()
+    engine.get_greeting()
+    for message in SCRIPT:
+        engine.process_message(message)
+    conversation_seconds = time.perf_counter() - start
+
+    full_catalog = estimate_tokens(SYSTEM_PROMPT_TEMPLATE.format(events_info=serialize_events_for_prompt(events)))
+    sent = [estimate_tokens(prompt) for prompt in client.system_prompts]
+    return full_catalog, sent, index_seconds, conversation_seconds
+
+
+def main(sizes=(20, 100, 500, 2000, 10000)):
+    original = list(events_data.EVENTS)
+    print(f"{'events':>8}{'full catalog tok':>18}{'sent mean tok':>15}{'sent max tok':>14}{'calls':>7}{'build ms':>10}{'conv ms':>9}")
+    try:
+        for size in sizes:
+            events = original if size == len(original) else make_events(size)
+            full_catalog, sent, index_seconds, conversation_seconds = run(events)
+            print(f"{size:>8}{full_catalog:>18}{statistics.mean(sent):>15.0f}{max(sent):>14}{len(sent):>7}"
+                  f"{index_seconds * 1000:>10.1f}{conversation_seconds * 1000:>9.1f}")
+    finally:
+        events_data.EVENTS[:] = original
+        events_data.mark_catalog_changed()
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (20, 100, 500, 2000, 10000))
@@ -0,0 +1,59 @@
+"""
+Benchmark - system prompt construction per LLM call
+Compares the legacy per-call json.dumps(indent=2) of the whole catalog against
+the current prompt: retrieved events from cached rows plus per-turn context.
+
+Run from the repository root:
+    python -m benchmarks.bench_system_prompt
+"""
+
+import json
+import timeit
+
+from chatbot_engine import ChatbotEngine, SYSTEM_PROMPT_TEMPLATE
+from events_data import EVENTS
+
+
+def legacy_system_prompt(engine):
+    """The original _get_system_prompt, kept here as the baseline"""
+    events_info = json.dumps([{
+        "id": e["id"],
+        "name": e["name"],
+        "category": e["category"],
+        "mood": e["mood"],
+        "date": e["date"],
+        "time": e["time"],
+        "venue": e["venue"],
+        "price": e["price"],
+        "available_seats": e["available_seats"],
+        "description": e["description"]
+    } for e in EVENTS], indent=2)
+
+    context = f"""Current conversation state: {engine.state}
+User data collected so far: {json.dumps(engine.user_data)}
+Current events being shown: {json.dumps([e["name"] for e in engine.current_events]) if engine.current_events else "None"}"""
+    return SYSTEM_PROMPT_TEMPLATE.format(events_info=events_info) + "\n\n" + context
+
+
+def main(number=2000):
+    engine = ChatbotEngine()
+    engine.state = "event_selection"
+    engine.user_data["name"] = "Sam"
+    engine.user_data["mood"] = "happy"
+    engine.current_event_ids = [e.id for e in EVENTS[:6]]
+
+    legacy_time = timeit.timeit(lambda: legacy_system_prompt(engine), number=number)
+    current_time = timeit.timeit(engine._get_system_prompt, number=number)
+
+    legacy_bytes = len(legacy_system_prompt(engine).encode("utf-8"))
+    current_bytes = len(engine._get_system_prompt().encode("utf-8"))
+
+    print(f"Catalog size: {len(EVENTS)} events, {number} calls")
+    print(f"{'':10}{'us/call':>12}{'bytes/turn':>14}")
+    print(f"{'legacy':10}{legacy_time / number * 1e6:>12.1f}{legacy_bytes:>14}")
+    print(f"{'current':10}{current_time / number * 1e6:>12.1f}{current_bytes:>14}")
+    print(f"Speedup: {legacy_time / current_time:.1f}x, bytes saved per turn: {legacy_bytes - current_bytes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Benchmark - batch ticket throughput from 1 to N worker processes
+
+Run from the repository root:
+    python -m benchmarks.bench_ticket_batch [count] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.bench_ticket_render import make_booking
+from ticket_generator import generate_tickets_batch
+
+
+def main(count=400, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    bookings = [make_booking(i) for i in range(count)]
+
+    print(f"{count} tickets, {os.cpu_count()} CPUs available")
+    print(f"{'workers':>8}{'tickets/s':>12}{'scaling':>10}")
+    worker_counts = sorted({2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers} | {max_workers})
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        for _ in generate_tickets_batch(bookings, workers=workers):
+            pass
+        rate = count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12.1f}{rate / baseline:>9.2f}x")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,110 @@
+"""
+Benchmark - background ticket image optimization under 1,000 bookings
+Each booking shows its QR and ticket once, then reruns and downloads them a
+little later. The legacy path started a thread per image and threw the
+result away; the pool path queues on a few shared threads and serves the
+optimized bytes on later reruns. The remote backend is simulated by a fixed
+latency that returns the image unchanged (no API key or network needed), so
+its rows show threads and queueing; the local backend shows the byte
+savings. Tickets are rendered up front so only optimization work differs.
+
+Run from the repository root:
+    python -m benchmarks.bench_ticket_optimizer [bookings] [remote_latency_ms]
+"""
+
+import sys
+import threading
+import time
+
+import ticket_generator
+from benchmarks.bench_ticket_render import make_booking
+from ticket_generator import LRUCache, generate_tickets_batch, get_qr_bytes, get_ticket_bytes, optimize_png_locally
+
+ARRIVAL_SECONDS = 0.02  # gap between bookings
+RERUN_DELAY = 200  # bookings later, the same session reruns and downloads
+
+
+def simulated_remote(latency):
+    def optimize(image_bytes):
+        time.sleep(latency)
+        return image_bytes
+    return optimize
+
+
+def legacy_optimize_async(optimizer):
+    """The original optimize_image_async: one thread per image, result discarded"""
+    def start(image_bytes):
+        threading.Thread(target=optimizer, args=(image_bytes,), daemon=True).start()
+    return start
+
+
+def prerender(bookings):
+    cache = LRUCache(len(bookings))
+    for index, ticket_id, qr_png, ticket_png in generate_tickets_batch(bookings):
+        cache.put(ticket_generator._render_cache_key(bookings[index]), (qr_png, ticket_png, ticket_id))
+    return cache
+
+
+def settle(threads):
+    """Wait for background optimizations from this mode to finish; pool threads stay alive"""
+    while ticket_generator._optimizing:
+        time.sleep(0.05)
+    pool = ticket_generator._optimizer_pool
+    while threading.active_count() > threads + (len(pool._threads) if pool else 0):
+        time.sleep(0.05)
+
+
+def run(bookings, baseline_threads, legacy_optimizer=None, optimizer=None):
+    ticket_generator._optimized_cache.clear()
+    ticket_generator._image_optimizer = lambda: optimizer
+    peak_threads = 0
+    served = []
+    optimized = 0
+
+    def view(booking):
+        qr, _ = get_qr_bytes(booking)
+        ticket, _ = get_ticket_bytes(booking)
+        if legacy_optimizer:
+            legacy_optimizer(qr.getvalue())
+            legacy_optimizer(ticket.getvalue())
+        return len(qr.getvalue()) + len(ticket.getvalue())
+
+    start = time.perf_counter()
+    for i in range(len(bookings) + RERUN_DELAY):
+        if i < len(bookings):
+            view(bookings[i])
+        if i >= RERUN_DELAY:
+            booking = bookings[i - RERUN_DELAY]
+            rendered = sum(len(png) for png in ticket_generator._render_cache.get(ticket_generator._render_cache_key(booking))[:2])
+            served.append(view(booking))
+            optimized += served[-1] < rendered
+        peak_threads = max(peak_threads, threading.active_count() - baseline_threads)
+        time.sleep(ARRIVAL_SECONDS)
+    elapsed = time.perf_counter() - start
+    settle(baseline_threads)
+    return peak_threads, sum(served) / len(served), optimized / len(served), elapsed
+
+
+def main(count=1000, latency_ms=500):
+    original = ticket_generator._image_optimizer
+    bookings = [make_booking(i) for i in range(count)]
+    ticket_generator._render_cache = prerender(bookings)
+    baseline_threads = threading.active_count()
+    remote = simulated_remote(latency_ms / 1000)
+    modes = [
+        ("no optimization", dict()),
+        ("thread per image", dict(legacy_optimizer=legacy_optimize_async(remote))),
+        ("pool, remote", dict(optimizer=remote)),
+        ("pool, local Pillow", dict(optimizer=optimize_png_locally)),
+    ]
+    print(f"{count} bookings, {ARRIVAL_SECONDS * 1000:.0f} ms apart; simulated remote latency {latency_ms} ms; "
+          f"{ticket_generator.OPTIMIZER_WORKERS} pool workers")
+    print(f"{'':<20}{'peak extra threads':>20}{'bytes/ticket on rerun':>23}{'optimized':>11}{'wall s':>9}")
+    for label, options in modes:
+        peak, served, optimized, elapsed = run(bookings, baseline_threads, **options)
+        print(f"{label:<20}{peak:>20}{served:>23.0f}{optimized:>11.0%}{elapsed:>9.2f}")
+    ticket_generator._image_optimizer = original
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,75 @@
+"""
+Benchmark - tickets rendered per second on one core
+Compares the legacy path (QR computed twice, full-size QR resampled into the
+ticket) against render_ticket_pngs (one QR matrix shared by both images).
+
+Run from the repository root:
+    python -m benchmarks.bench_ticket_render
+"""
+
+import io
+import time
+
+import qrcode
+
+from ticket_generator import create_ticket_image, generate_qr_matrix, render_ticket_pngs
+
+
+def legacy_qr_image(booking_data):
+    """The original generate_qr_code: matrix plus a full-size RGB image"""
+    matrix, ticket_id = generate_qr_matrix(booking_data)
+    qr = qrcode.QRCode(box_size=10, border=0)
+    qr.modules = [row[:] for row in matrix]
+    qr.modules_count = len(matrix)
+    return qr.make_image(fill_color="#000000", back_color="#ffffff"), matrix, ticket_id
+
+
+def legacy_render(booking_data):
+    """QR computed for the preview and again for the ticket, as before
+
+    The ticket itself is composed with the current create_ticket_image, so the
+    legacy figure slightly flatters the old path (no large bicubic resample).
+    """
+    qr_image, _, ticket_id = legacy_qr_image(booking_data)
+    qr_png = io.BytesIO()
+    qr_image.save(qr_png, format="PNG")
+
+    _, matrix, _ = legacy_qr_image(booking_data)
+    ticket_image, _ = create_ticket_image(booking_data, matrix, ticket_id)
+    ticket_png = io.BytesIO()
+    ticket_image.save(ticket_png, format="PNG")
+    return qr_png.getvalue(), ticket_png.getvalue(), ticket_id
+
+
+def make_booking(i):
+    return {
+        "ticket_id": f"BENCH{i:07d}",
+        "name": "Sam Rivera",
+        "email": "sam@example.com",
+        "event": "Acoustic Nights - Live Music",
+        "date": "2026-03-20",
+        "time": "7:00 PM",
+        "venue": "The Blue Note Lounge",
+        "tickets": 1 + i % 10,
+        "total": 25.0 * (1 + i % 10)
+    }
+
+
+def tickets_per_second(render, count):
+    start = time.perf_counter()
+    for i in range(count):
+        render(make_booking(i))
+    return count / (time.perf_counter() - start)
+
+
+def main(count=200):
+    legacy = tickets_per_second(legacy_render, count)
+    shared = tickets_per_second(render_ticket_pngs, count)
+    print(f"{count} tickets, single core")
+    print(f"{'legacy':10}{legacy:>10.1f} tickets/s")
+    print(f"{'shared QR':10}{shared:>10.1f} tickets/s")
+    print(f"Speedup: {shared / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Load test - concurrent conversations per worker with AsyncChatbotEngine
+Runs full booking conversations against a local mock Groq server from a single
+event loop and reports how many were in flight at once.
+
+Run from the repository root:
+    python -m benchmarks.load_async_engine [sessions...]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_groq import MockGroqServer
+from chatbot_engine import ASYNC_CLIENT_SHARDS, AsyncChatbotEngine, make_async_groq_clients
+from inventory import SeatInventory
+
+SCRIPT = ["Sam", "I'm feeling happy", "1", "1", "sam@example.com", "no"]
+MOCK_LATENCY = 0.25
+
+
+async def conversation(client, inventory):
+    engine = AsyncChatbotEngine(inventory=inventory, async_client=client)
+    await engine.get_greeting_async()
+    for message in SCRIPT:
+        await engine.process_message_async(message)
+    return engine.state
+
+
+async def run(sessions, inventory, shards):
+    server = await MockGroqServer(latency=MOCK_LATENCY).start()
+    clients = make_async_groq_clients("mock", base_url=server.base_url, max_connections=sessions, shards=shards)
+    start = time.perf_counter()
+    states = await asyncio.gather(*(conversation(next(clients), inventory) for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    for _ in range(shards):
+        await next(clients).close()
+    await server.stop()
+    return elapsed, server, states
+
+
+def main(sizes=(10, 100, 500)):
+    inventory = SeatInventory(os.path.join(tempfile.mkdtemp(), "inventory.db"))
+    inventory.seed([{"id": i, "available_seats": 10 ** 6} for i in range(1, 21)])
+    llm_turns = len(SCRIPT)  # greeting plus every scripted turn except the template-only booking confirmation
+    serial = llm_turns * MOCK_LATENCY
+
+    print(f"Mock LLM latency {MOCK_LATENCY * 1000:.0f} ms, {llm_turns} LLM calls per conversation ({serial:.2f}s if run serially)")
+    print(f"{'sessions':>9}{'shards':>8}{'wall s':>9}{'peak in flight':>16}{'requests':>10}{'conv/s':>9}")
+    for sessions in sizes:
+        for shards in sorted({1, min(ASYNC_CLIENT_SHARDS, sessions)}):
+            elapsed, server, states = asyncio.run(run(sessions, inventory, shards))
+            assert all(state == "ended" for state in states), states
+            print(f"{sessions:>9}{shards:>8}{elapsed:>9.2f}{server.peak_in_flight:>16}{server.requests:>10}{sessions / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 500))
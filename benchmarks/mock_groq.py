@@ -0,0 +1,186 @@
+"""
+Local mock of the Groq chat completions endpoint for load tests
+A minimal asyncio HTTP/1.1 server speaking just enough of
+POST /openai/v1/chat/completions (plain JSON and SSE streaming) for the SDK.
+
+Use from code:
+    server = MockGroqServer(latency=0.2)
+    await server.start()   # server.base_url -> pass as base_url to Groq/AsyncGroq
+    ...
+    await server.stop()
+
+or, for the sync Groq client, from a background thread:
+    server = MockGroqServer(latency=0.2).start_in_thread()
+    ...
+    server.stop_in_thread()
+
+Pass ssl_context (see make_self_signed_tls) to serve HTTPS, and
+quota=(requests, tokens, period_seconds) to answer 429 with retry-after like
+the real API once the request or token quota is used up. Quota refills
+continuously, `requests` and `tokens` per period.
+"""
+
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import threading
+import time
+
+from conversation_history import estimate_tokens
+
+
+def make_self_signed_tls(directory):
+    """Write a self-signed certificate for 127.0.0.1 into directory; returns (server ssl context, cert path)
+
+    Point clients at the certificate with SSL_CERT_FILE (httpx trusts it from the environment).
+    """
+    cert = os.path.join(directory, "mock_groq_cert.pem")
+    key = os.path.join(directory, "mock_groq_key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-keyout", key, "-out", cert,
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost"],
+        check=True, capture_output=True
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context, cert
+
+
+class MockGroqServer:
+    """Answers every completion after `latency` seconds and records concurrency"""
+
+    def __init__(self, latency=0.2, host="127.0.0.1", port=0, reply="Sounds great. Here is what I found.", ssl_context=None, quota=None):
+        self.latency = latency
+        self.ssl_context = ssl_context
+        self.host = host
+        self.port = port
+        self.reply = reply
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections = 0
+        self.quota = quota
+        self.rate_limited = 0
+        if quota:
+            self._allowance = [float(quota[0]), float(quota[1])]  # requests, tokens left
+            self._refilled = time.monotonic()
+        self._server = None
+        self._writers = set()
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        scheme = "https" if self.ssl_context else "http"
+        return f"{scheme}://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096, ssl=self.ssl_context)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    def start_in_thread(self):
+        """Serve from an event loop on a daemon thread"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mock-groq", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        return self
+
+    def stop_in_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(writer, json.loads(body or b"{}"))
+        except (ConnectionError, ssl.SSLError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _retry_after(self, tokens):
+        """Charge a request of `tokens` to the quota and return None, or the seconds until it would fit"""
+        max_requests, max_tokens, period = self.quota
+        now = time.monotonic()
+        elapsed, self._refilled = now - self._refilled, now
+        requests = self._allowance[0] = min(max_requests, self._allowance[0] + elapsed * max_requests / period)
+        available = self._allowance[1] = min(max_tokens, self._allowance[1] + elapsed * max_tokens / period)
+        if requests >= 1 and available >= tokens:
+            self._allowance[0] -= 1
+            self._allowance[1] -= tokens
+            return None
+        return max((1 - requests) * period / max_requests, (tokens - available) * period / max_tokens, 0.001)
+
+    async def _respond(self, writer, payload):
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in payload.get("messages", []))
+        completion_tokens = estimate_tokens(self.reply)
+        if self.quota:
+            retry_after = self._retry_after(prompt_tokens + completion_tokens)
+            if retry_after is not None:
+                self.rate_limited += 1
+                body = json.dumps({"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}}).encode()
+                writer.write(
+                    f"HTTP/1.1 429 Too Many Requests\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                    f"retry-after: {retry_after:.3f}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                return
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        created = int(time.time())
+        if payload.get("stream"):
+            events = []
+            for word in self.reply.split(" "):
+                chunk = {"id": "mock", "object": "chat.completion.chunk", "created": created, "model": payload.get("model"),
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                events.append(f"data: {json.dumps(chunk)}\n\n")
+            events.append("data: [DONE]\n\n")
+            body = "".join(events).encode()
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps({
+                "id": "mock", "object": "chat.completion", "created": created, "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}
+            }).encode()
+            content_type = "application/json"
+
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
@@ -0,0 +1,161 @@
+"""
+Simulation - hot-reloading the event catalog under concurrent sessions
+Booking sessions run on several threads while a new compiled catalog is
+renamed over the served file once a second, as a deploy would: each
+generation changes every price, tags every venue with its generation, drops
+the oldest events and adds new ones. The CatalogWatcher picks each file up,
+builds the new catalog on its thread and swaps it in; files replaced while
+a reload is still running are skipped for the newest one. Fails (exit code 1)
+if a session raises, if one response mixes events from two catalog
+generations, if a new event was listed before its seats were stocked, if a
+confirmed ticket changes after a reload, or if the last generation is not
+live at the end.
+
+Run from the repository root:
+    python -m benchmarks.sim_catalog_reload [seconds] [sessions] [events]
+"""
+
+import contextlib
+import io
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import events_data
+from benchmarks.synthetic import iter_events
+from chatbot_engine import ChatbotEngine
+from event_store import compile_catalog
+from events_data import CatalogWatcher, get_catalog, on_catalog_reload, reload_catalog
+from inventory import SeatInventory
+
+PUBLISH_SECONDS = 1.0
+POLL_SECONDS = 0.05
+TURNOVER = 0.1  # share of events replaced by each generation
+
+GENERATION = re.compile(r"\(gen (\d+)\)")
+SCRIPT = ["Sam", "I'm feeling happy and curious", "1", "2", "sam@example.com"]
+
+
+def publish(path, generation, count):
+    """Compile generation g: ids shifted by g * turnover, prices up g cents, venues tagged"""
+    first = generation * int(count * TURNOVER)
+    rows = iter_events(first + count)
+    for _ in range(first):
+        next(rows)
+    events = []
+    for row in rows:
+        row["venue"] = f"{row['venue']} (gen {generation})"
+        row["price"] = round(row["price"] + generation / 100, 2)
+        events.append(row)
+    compile_catalog(events, path)
+
+
+class Session(threading.Thread):
+    def __init__(self, inventory, stop, results):
+        super().__init__(daemon=True)
+        self.inventory = inventory
+        self.stop = stop
+        self.results = results
+
+    def run(self):
+        try:
+            while not self.stop.is_set():
+                self.book()
+        except Exception as e:
+            self.results["errors"].append(repr(e))
+
+    def book(self):
+        engine = ChatbotEngine(inventory=self.inventory, fast_path=True)
+        engine.groq_client = None  # fallback replies only; no network calls
+        for message in SCRIPT:
+            start = time.perf_counter()
+            response = engine.process_message(message)
+            self.results["turn_ms"].append((time.perf_counter() - start) * 1000)
+
+            generations = set(GENERATION.findall(response))
+            if len(generations) > 1:
+                self.results["mixed"].append(sorted(generations))
+            if "no longer available" in response:
+                self.results["removed"] += 1
+            for event in engine.current_events:
+                if self.inventory.available(event.id) is None:
+                    self.results["unstocked"].append(event.id)
+            if engine.state not in ("event_selection", "ticket_count", "email_collection", "booking_complete") and message != SCRIPT[0]:
+                return  # sold out or the event went away; start over
+        if engine.state == "booking_complete":
+            self.results["bookings"].append((engine, dict(engine.get_booking_data())))
+
+
+def live_generation():
+    match = GENERATION.search(get_catalog().events[0].venue)
+    return int(match.group(1)) if match else None
+
+
+def main(seconds=10, sessions=8, count=20000):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "events.tcat")
+    publish(path, 0, count)
+    generations = int(seconds / PUBLISH_SECONDS)
+    for generation in range(1, generations + 1):
+        publish(os.path.join(directory, f"gen{generation}.tcat"), generation, count)
+
+    inventory = SeatInventory(os.path.join(directory, "inventory.db"))
+    on_catalog_reload(lambda catalog: inventory.seed(catalog.events))
+    build_start = time.perf_counter()
+    reload_catalog(path)
+    build = time.perf_counter() - build_start
+    watcher = CatalogWatcher(path, interval=POLL_SECONDS).start()
+
+    stop = threading.Event()
+    results = {"errors": [], "mixed": [], "unstocked": [], "turn_ms": [], "bookings": [], "removed": 0}
+    threads = [Session(inventory, stop, results) for _ in range(sessions)]
+    with contextlib.redirect_stdout(io.StringIO()):  # without an API key each engine prints a warning
+        for thread in threads:
+            thread.start()
+        for generation in range(1, generations + 1):
+            time.sleep(PUBLISH_SECONDS)
+            os.replace(os.path.join(directory, f"gen{generation}.tcat"), path)
+        deadline = time.perf_counter() + 30
+        while live_generation() != generations and time.perf_counter() < deadline:
+            time.sleep(POLL_SECONDS)
+        time.sleep(0.5)  # turns still in flight on the old catalog finish
+        stop.set()
+        for thread in threads:
+            thread.join()
+    watcher.stop()
+
+    catalog = get_catalog()
+    live = {int(g) for e in catalog.events for g in GENERATION.findall(e.venue)}
+    changed = [(booked["venue"], engine.get_booking_data()["venue"]) for engine, booked in results["bookings"]
+               if engine.get_booking_data() != booked]
+    outlived = [booked for _, booked in results["bookings"] if GENERATION.search(booked["venue"]).group(1) != str(generations)]
+    turns = sorted(results["turn_ms"])
+
+    print(f"{count} events, {sessions} sessions, a new catalog every {PUBLISH_SECONDS:.0f}s for {seconds}s "
+          f"(load + catalog indexes {build:.2f}s)")
+    print(f"Catalog files published {generations}, reloaded {watcher.reloads} (the rest skipped for a newer file), "
+          f"failed {watcher.failures}; live version {catalog.version}, generation {sorted(live)}")
+    print(f"Turns {len(turns)}: p50 {statistics.median(turns):.1f} ms, p99 {turns[int(len(turns) * 0.99)]:.1f} ms, "
+          f"max {turns[-1]:.1f} ms")
+    print(f"Bookings {len(results['bookings'])}, {len(outlived)} of them before a later reload "
+          f"(tickets unchanged: {not changed}); picks of events a reload removed {results['removed']}")
+    print(f"Responses mixing generations {len(results['mixed'])}, listed before stocked {len(results['unstocked'])}, "
+          f"errors {len(results['errors'])}")
+
+    failed = (results["errors"] or results["mixed"] or results["unstocked"] or changed
+              or watcher.failures or live != {generations} or not results["bookings"])
+    if results["errors"]:
+        print("First error:", results["errors"][0])
+    if failed:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+    events_data.EVENTS_FILE = ""
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""
+Simulation - Groq quotas with and without the client-side rate limiter
+Interactive sessions and a cache pre-warm job share one process and call a
+local mock Groq server that enforces a request and token quota (a minute of
+quota compressed into a few seconds). Without token buckets every session
+finds out about the quota from 429s; with them requests wait their turn and
+interactive calls go ahead of pre-warming. Fails (exit code 1) if the limiter
+run drops interactive calls or queues them longer than pre-warm calls.
+
+Run from the repository root:
+    python -m benchmarks.sim_rate_limit [sessions] [calls_per_session] [prewarm_calls]
+"""
+
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "mock")
+
+from benchmarks.mock_groq import MockGroqServer
+
+import chatbot_engine
+from chatbot_engine import ChatbotEngine, make_groq_client
+from rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_PREWARM, RateLimiter
+
+QUOTA_REQUESTS = 40
+QUOTA_TOKENS = 60000
+QUOTA_PERIOD = 4.0  # seconds standing in for the real one-minute window
+MOCK_LATENCY = 0.05
+SESSION_THINK_SECONDS = 2.0  # users pause up to this long between messages
+
+
+def caller(limiter, priority, calls, think, results):
+    engine = ChatbotEngine()
+    engine.rate_limiter = limiter
+    engine._log_groq_error = lambda error: None  # failures are counted below instead
+    rng = random.Random(id(engine))
+    for _ in range(calls):
+        time.sleep(rng.uniform(0, think))
+        start = time.perf_counter()
+        text = engine._call_groq("How do I pick an event?", history=False, priority=priority)
+        results.append((priority, time.perf_counter() - start, text is not None))
+
+
+def run(label, limiter, sessions, calls, prewarm_calls):
+    server = MockGroqServer(latency=MOCK_LATENCY, quota=(QUOTA_REQUESTS, QUOTA_TOKENS, QUOTA_PERIOD)).start_in_thread()
+    chatbot_engine._groq_client = make_groq_client("mock", server.base_url)
+    results = []
+    threads = [threading.Thread(target=caller, args=(limiter, PRIORITY_PREWARM, prewarm_calls, 0, results))]
+    threads += [threading.Thread(target=caller, args=(limiter, PRIORITY_INTERACTIVE, calls, SESSION_THINK_SECONDS, results)) for _ in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.stop_in_thread()
+
+    failures = {}
+    for priority, name in ((PRIORITY_INTERACTIVE, "interactive"), (PRIORITY_PREWARM, "prewarm")):
+        latencies = sorted(seconds for p, seconds, _ in results if p == priority)
+        failed = sum(1 for p, _, ok in results if p == priority and not ok)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        failures[name] = failed
+        print(f"{label:<16}{name:<13}{len(latencies):>7}{failed:>8}{statistics.mean(latencies) * 1000:>10.0f}{p95 * 1000:>10.0f}")
+    stats = limiter.stats()
+    waits = ", ".join(
+        f"{'interactive' if priority == PRIORITY_INTERACTIVE else 'prewarm'} {w['mean_ms']:.0f}/{w['max_ms']:.0f}"
+        for priority, w in sorted(stats["waits"].items())
+    )
+    print(f"{'':<16}server 429s {server.rate_limited}, accepted {server.requests}, wall {elapsed:.1f}s; "
+          f"limiter peak queue {stats['peak_queue_depth']}, queue wait mean/max ms: {waits}")
+    return failures, stats
+
+
+def main(sessions=12, calls=8, prewarm_calls=80):
+    print(f"Quota {QUOTA_REQUESTS} requests / {QUOTA_TOKENS} tokens per {QUOTA_PERIOD:.0f}s; "
+          f"{sessions} sessions x {calls} calls plus {prewarm_calls} pre-warm calls")
+    print(f"{'':<16}{'':<13}{'calls':>7}{'failed':>8}{'mean ms':>10}{'p95 ms':>10}")
+    run("retry only", RateLimiter(0, 0), sessions, calls, prewarm_calls)
+    failed, stats = run("token buckets", RateLimiter(QUOTA_REQUESTS, QUOTA_TOKENS, period=QUOTA_PERIOD), sessions, calls, prewarm_calls)
+
+    waits = stats["waits"]
+    # 1 ms of slack so an uncontended run isn't judged on lock timing
+    if failed["interactive"] or waits[PRIORITY_INTERACTIVE]["mean_ms"] > waits[PRIORITY_PREWARM]["mean_ms"] + 1:
+        print("FAIL: interactive calls were dropped or queued longer than pre-warm calls")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
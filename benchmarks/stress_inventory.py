@@ -0,0 +1,112 @@
+"""
+Stress test - concurrent seat reservations against a single event
+Hundreds of threads across several processes reserve, confirm, release and
+abandon holds on one event. Fails (exit code 1) if the seat count ever goes
+negative or seats are lost or oversold.
+
+Run from the repository root:
+    python -m benchmarks.stress_inventory [processes] [threads_per_process] [seats]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from inventory import SeatInventory
+
+EVENT_ID = 1
+OPERATIONS_PER_THREAD = 20
+
+
+def worker_thread(inventory, seed, confirmed_out):
+    rng = random.Random(seed)
+    confirmed = 0
+    for _ in range(OPERATIONS_PER_THREAD):
+        n = rng.randint(1, 10)
+        hold_id = inventory.reserve(EVENT_ID, n)
+        if not hold_id:
+            continue
+        action = rng.random()
+        if action < 0.4:
+            if inventory.confirm(hold_id):
+                confirmed += n
+        elif action < 0.8:
+            inventory.release(hold_id)
+        # otherwise abandon the hold and let it expire
+    confirmed_out.append(confirmed)
+
+
+def worker_process(path, threads, seed, results):
+    # Short TTL so abandoned holds expire while the test is still running
+    inventory = SeatInventory(path, hold_ttl=0.05)
+    confirmed = []
+    pool = [threading.Thread(target=worker_thread, args=(inventory, seed * 1000 + i, confirmed)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put(sum(confirmed))
+
+
+def monitor(path, stop, minimum):
+    inventory = SeatInventory(path)
+    while not stop.is_set():
+        minimum[0] = min(minimum[0], inventory.available(EVENT_ID))
+        time.sleep(0.01)
+
+
+def main(processes=4, threads=100, seats=500):
+    path = os.path.join(tempfile.mkdtemp(), "inventory.db")
+    inventory = SeatInventory(path, hold_ttl=0.05)
+    inventory.seed([{"id": EVENT_ID, "available_seats": seats}])
+
+    stop = threading.Event()
+    minimum = [seats]
+    watcher = threading.Thread(target=monitor, args=(path, stop, minimum))
+    watcher.start()
+
+    start = time.perf_counter()
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker_process, args=(path, threads, p, results)) for p in range(processes)]
+    for p in procs:
+        p.start()
+    confirmed_by_workers = sum(results.get() for _ in procs)
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    watcher.join()
+
+    time.sleep(0.1)
+    inventory.expire_holds()
+    available = inventory.available(EVENT_ID)
+    db = inventory._connect()
+    confirmed_in_db = db.execute("SELECT COALESCE(SUM(seats), 0) FROM holds WHERE confirmed = 1").fetchone()[0]
+    pending = db.execute("SELECT COUNT(*) FROM holds WHERE confirmed = 0").fetchone()[0]
+    operations = processes * threads * OPERATIONS_PER_THREAD
+
+    print(f"{processes} processes x {threads} threads, {operations} reservations in {elapsed:.2f}s")
+    print(f"Seats: start {seats}, sold {confirmed_in_db}, available {available}, lowest seen {minimum[0]}, pending holds {pending}")
+
+    failures = []
+    if minimum[0] < 0 or available < 0:
+        failures.append("seat count went negative")
+    if confirmed_in_db != confirmed_by_workers:
+        failures.append(f"workers confirmed {confirmed_by_workers} seats but the store recorded {confirmed_in_db}")
+    if available + confirmed_in_db != seats:
+        failures.append(f"seats lost or oversold: {available} available + {confirmed_in_db} sold != {seats}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: no oversell, no lost seats")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
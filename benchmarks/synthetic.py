@@ -0,0 +1,38 @@
+"""
+Synthetic event catalogs for benchmarks
+"""
+
+import random
+from datetime import date, timedelta
+
+from events_data import CATEGORIES, MOODS
+
+VENUES = ["Silicon Valley Convention Center", "The Blue Note Lounge", "Innovation Hub Downtown",
+          "Serenity Gardens", "Central Park", "Sky Lounge Rooftop", "The Spoken Word Cafe"]
+TIMES = ["9:00 AM", "11:00 AM", "2:00 PM", "6:00 PM", "7:00 PM", "9:00 PM"]
+
+
+def make_events(count, seed=42):
+    """Build count event dicts shaped like events_data.EVENTS"""
+    return list(iter_events(count, seed))
+
+
+def iter_events(count, seed=42):
+    """Yield the same event dicts as make_events one at a time, for catalogs too big to hold as dicts"""
+    rng = random.Random(seed)
+    start = date(2026, 3, 1)
+    dates = [(start + timedelta(days=d)).isoformat() for d in range(365)]
+    for i in range(1, count + 1):
+        category = rng.choice(CATEGORIES)
+        yield {
+            "id": i,
+            "name": f"{category.title()} Event #{i}",
+            "category": category,
+            "mood": rng.sample(MOODS, rng.randint(3, 7)),
+            "date": rng.choice(dates),
+            "time": rng.choice(TIMES),
+            "venue": rng.choice(VENUES),
+            "price": round(rng.uniform(5, 120), 2),
+            "available_seats": rng.randint(0, 500),
+            "description": f"A {category} event for people feeling {rng.choice(MOODS)}."
+        }
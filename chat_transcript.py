@@ -0,0 +1,54 @@
+"""
+Chat Transcript - Conversation rendering for the Streamlit app
+Each message's HTML is built once, when the message is added, and stored with
+it. Only the latest page of messages is drawn on a rerun; older pages load on
+demand inside a fragment, so paging doesn't rerun the whole app.
+"""
+
+import os
+
+import streamlit as st
+
+CHAT_PAGE_SIZE = int(os.environ.get("TICKETBOT_CHAT_PAGE_SIZE", "30"))
+
+
+def message_html(role, content):
+    """HTML bubble for one message"""
+    if role == "user":
+        return f'<div class="chat-message-user">{content}</div>'
+    return f'<div class="chat-message-bot">{content.replace(chr(10), "<br>")}</div>'
+
+
+def add_message(role, content):
+    """Append a message to the session transcript, rendering its HTML once"""
+    messages = st.session_state.messages
+    message = {"id": len(messages), "role": role, "content": content, "html": message_html(role, content)}
+    messages.append(message)
+    return message
+
+
+def reset_transcript():
+    st.session_state.messages = []
+    st.session_state.visible_messages = CHAT_PAGE_SIZE
+
+
+def show_earlier_messages():
+    st.session_state.visible_messages = st.session_state.get("visible_messages", CHAT_PAGE_SIZE) + CHAT_PAGE_SIZE
+
+
+@st.fragment
+def render_transcript(count):
+    """Draw the latest page of the first `count` messages, with a button to page back
+
+    count is fixed when the app run calls this, so a fragment-only rerun (paging)
+    never draws messages that the full run rendered outside the fragment.
+    """
+    messages = st.session_state.messages
+    start = max(0, count - st.session_state.get("visible_messages", CHAT_PAGE_SIZE))
+    if start:
+        st.button(f"Show earlier messages ({start})", on_click=show_earlier_messages, key="show_earlier_messages")
+    # One element for the whole page instead of one per message
+    st.markdown("".join(
+        message.get("html") or message_html(message["role"], message["content"])
+        for message in messages[start:count]
+    ), unsafe_allow_html=True)
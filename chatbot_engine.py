@@ -6,8 +6,21 @@ Uses Llama model for natural conversations with mood-based event recommendations
 import re
 import os
 import json
-from groq import Groq
-from events_data import EVENTS, MOODS, CATEGORIES
+import itertools
+import random
+import threading
+import time
+import asyncio
+import importlib.util
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from events_data import MOODS, CATEGORIES, get_catalog
+from event_retrieval import get_event_index
+from conversation_history import ConversationHistory, estimate_tokens
+from inventory import get_inventory
+from llm_cache import LLMResponseCache, get_llm_cache
+from rate_limiter import MAX_RETRIES, PRIORITY_INTERACTIVE, PRIORITY_PREWARM, backoff_delay, get_rate_limiter
+from ticket_generator import generate_ticket_id
 
 # Try to import streamlit for secrets (deployment)
 try:
@@ -16,55 +29,13 @@ try:
 except ImportError:
     HAS_STREAMLIT = False
 
-class ChatbotEngine:
-    def __init__(self):
-        self.state = "greeting"
-        self.user_data = {
-            "name": None,
-            "mood": None,
-            "selected_event": None,
-            "num_tickets": 1,
-            "email": None
-        }
-        self.conversation_history = []
-        self.current_events = []
-        self.groq_client = None
-        self._init_groq()
-        
-    def _init_groq(self):
-        """Initialize Groq client"""
-        # Try Streamlit secrets first (for deployment), then environment variable
-        api_key = None
-        if HAS_STREAMLIT:
-            try:
-                api_key = st.secrets.get("GROQ_API_KEY")
-            except:
-                pass
-        
-        if not api_key:
-            api_key = os.environ.get("GROQ_API_KEY")
-            
-        if api_key:
-            self.groq_client = Groq(api_key=api_key)
-        else:
-            print("Warning: GROQ_API_KEY not found. Using fallback responses.")
-    
-    def _get_system_prompt(self):
-        """Get the system prompt for the AI"""
-        events_info = json.dumps([{
-            "id": e["id"],
-            "name": e["name"],
-            "category": e["category"],
-            "mood": e["mood"],
-            "date": e["date"],
-            "time": e["time"],
-            "venue": e["venue"],
-            "price": e["price"],
-            "available_seats": e["available_seats"],
-            "description": e["description"]
-        } for e in EVENTS], indent=2)
-        
-        return f"""You are TicketBot, a friendly and helpful event ticketing assistant with a retro minimalist personality. Your responses should be:
+# The groq SDK (and httpx under it) is imported when the first client is built, not at
+# startup, so the app's first page render doesn't wait for it
+
+# HTTP/2 for the shared Groq client needs the optional h2 package (pip install "httpx[http2]")
+HAS_H2 = importlib.util.find_spec("h2") is not None
+
+SYSTEM_PROMPT_TEMPLATE = """You are TicketBot, a friendly and helpful event ticketing assistant with a retro minimalist personality. Your responses should be:
 - Concise but warm (2-4 sentences typically)
 - No emojis ever
 - Natural and conversational
@@ -73,10 +44,6 @@ class ChatbotEngine:
 You help users discover events based on their mood and book tickets. Here are the available events:
 {events_info}
 
-Current conversation state: {self.state}
-User data collected so far: {json.dumps(self.user_data)}
-Current events being shown: {json.dumps([e["name"] for e in self.current_events]) if self.current_events else "None"}
-
 IMPORTANT RULES:
 1. In "greeting" state: Greet the user and ask for their name. Be warm and introduce yourself as TicketBot.
 2. In "mood_check" state: Ask about their mood/feelings in a natural way. Acknowledge their name.
@@ -89,108 +56,677 @@ IMPORTANT RULES:
 When recommending events, ONLY recommend events from the provided list. Include the number, name, date, time, venue, and price.
 
 Keep responses SHORT - no more than 4-5 lines unless listing events."""
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+GROQ_MAX_TOKENS = 400
+
+# Longest an interactive turn queues for rate limit capacity before using its fallback
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("GROQ_RATE_LIMIT_MAX_WAIT", "10"))
+
+# Serve repeatable replies (greeting, mood empathy, validation prompts) from llm_cache
+LLM_CACHE_ENABLED = os.environ.get("TICKETBOT_LLM_CACHE", "1") != "0"
+# Fill the cache at startup: "auto" only when rate limit quotas are set, so the calls are
+# paced behind chat turns instead of running into 429s; "1" always, "0" never
+LLM_CACHE_PREWARM = os.environ.get("TICKETBOT_LLM_CACHE_PREWARM", "auto")
+# Most events whose acknowledgement is pre-warmed (the first match for each mood)
+PREWARM_EVENT_LIMIT = int(os.environ.get("TICKETBOT_PREWARM_EVENTS", "20"))
+
+# Answer deterministic transitions (invalid input, seat shortage, ticket count confirmation)
+# from their templates instead of the LLM; open-ended turns still use the LLM
+FAST_PATH_ENABLED = os.environ.get("TICKETBOT_FAST_PATH", "0") == "1"
+
+# Seconds the mood empathy line may take; past that the event list is shown without it
+EMPATHY_LATENCY_BUDGET = float(os.environ.get("TICKETBOT_EMPATHY_BUDGET", "2.5"))
+PREFETCH_WORKERS = 32
+
+_prefetch_pool = None
+_prefetch_pool_lock = threading.Lock()
+
+def get_prefetch_pool():
+    """Threads that run LLM requests sent ahead of the rest of the turn"""
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        with _prefetch_pool_lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="llm-prefetch")
+    return _prefetch_pool
+
+# Booking handles kept out of LLM prompts
+PROMPT_HIDDEN_USER_FIELDS = ("hold_id", "ticket_id")
+
+PROMPT_EVENT_FIELDS = ("id", "name", "category", "mood", "date", "time", "venue", "price", "available_seats", "description")
+
+# Most events listed in one system prompt; retrieval picks which ones, so prompts don't grow with the catalog
+PROMPT_EVENT_LIMIT = int(os.environ.get("TICKETBOT_PROMPT_EVENTS", "8"))
+
+_PROMPT_HEAD, _PROMPT_TAIL = SYSTEM_PROMPT_TEMPLATE.split("{events_info}")
+
+# (catalog_version, {event_id: serialized row}) shared by every engine instance in the process
+_prompt_rows = (None, {})
+
+def serialize_events_for_prompt(events, version=None):
+    """Serialize events as compact JSON, one event per line; rows are reused within a catalog version
     
-    def _call_groq(self, user_message):
-        """Call Groq API for a response with timeout"""
+    version is that of the catalog the events came from (default: the current one).
+    """
+    global _prompt_rows
+    if version is None:
+        version = get_catalog().version
+    cached_version, rows = _prompt_rows
+    if cached_version != version:
+        rows = {}
+        # A turn still on the catalog from before a reload must not replace the newer rows
+        if cached_version is None or version > cached_version:
+            _prompt_rows = (version, rows)
+    serialized = []
+    for e in events:
+        row = rows.get(e.id)
+        if row is None:
+            row = rows[e.id] = json.dumps({field: getattr(e, field) for field in PROMPT_EVENT_FIELDS}, separators=(",", ":"))
+        serialized.append(row)
+    return "[\n" + ",\n".join(serialized) + "\n]"
+
+MOOD_KEYWORDS = {
+    "excited": ["excited", "pumped", "thrilled", "can't wait", "hyped", "psyched", "stoked"],
+    "happy": ["happy", "great", "good", "wonderful", "fantastic", "amazing", "awesome", "joyful"],
+    "energetic": ["energetic", "energized", "active", "lively", "dynamic", "vibrant"],
+    "relaxed": ["relaxed", "chill", "calm", "peaceful", "easy", "laid back", "mellow"],
+    "stressed": ["stressed", "anxious", "worried", "overwhelmed", "pressure", "tense", "nervous"],
+    "sad": ["sad", "down", "upset", "unhappy", "depressed", "low", "blue", "heartbroken"],
+    "bored": ["bored", "boring", "nothing to do", "dull", "uninterested", "restless"],
+    "tired": ["tired", "exhausted", "sleepy", "drained", "fatigue", "worn out", "burnt out"],
+    "lonely": ["lonely", "alone", "isolated", "by myself", "need company"],
+    "curious": ["curious", "interested", "wondering", "explore", "want to learn", "intrigued"],
+    "creative": ["creative", "artistic", "artsy", "imaginative", "want to create"],
+    "motivated": ["motivated", "driven", "determined", "focused", "goal oriented"],
+    "adventurous": ["adventurous", "adventure", "explore", "new things", "try something new"],
+    "romantic": ["romantic", "love", "date", "partner", "couple"],
+    "social": ["social", "want to meet", "hang out", "make friends", "people", "party"],
+    "nostalgic": ["nostalgic", "memories", "old times", "remember", "throwback", "retro"],
+    "competitive": ["competitive", "want to win", "challenge", "beat", "compete"],
+    "playful": ["playful", "fun", "games", "play", "silly"]
+}
+
+def _trie_pattern(keywords):
+    """Build a regex alternation factored by common prefixes so matching never rescans a keyword"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here but longer ones continue: prefer the longer match
+        return f"(?:{body})?" if "" in node else body
+    
+    return build(trie)
+
+def _build_mood_matcher(mood_keywords):
+    """Compile all mood keywords into one word-bounded regex plus a keyword -> moods index"""
+    keyword_moods = {}
+    for mood, keywords in mood_keywords.items():
+        for keyword in keywords:
+            keyword_moods.setdefault(keyword, []).append(mood)
+    return re.compile(rf"\b{_trie_pattern(keyword_moods)}\b"), keyword_moods
+
+_MOOD_PATTERN, _KEYWORD_MOODS = _build_mood_matcher(MOOD_KEYWORDS)
+_MOOD_PRIORITY = {mood: i for i, mood in enumerate(MOOD_KEYWORDS)}
+
+def detect_moods(text):
+    """Return every mood mentioned in text as (mood, score) pairs, highest score first"""
+    # Whole-word matching in one pass, so "low" no longer fires inside "follow"
+    scores = {}
+    for keyword in _MOOD_PATTERN.findall(text.lower().replace("\u2019", "'")):
+        for mood in _KEYWORD_MOODS[keyword]:
+            scores[mood] = scores.get(mood, 0) + 1
+    # Ties keep the keyword table order, matching the old first-hit behaviour
+    return sorted(scores.items(), key=lambda item: (-item[1], _MOOD_PRIORITY[item[0]]))
+
+def groq_retry_info(error):
+    """(retryable, rate limited, retry-after seconds) for an error raised by the Groq SDK"""
+    from groq import APIConnectionError  # already loaded: the error came from a client
+    
+    if isinstance(error, APIConnectionError):  # includes timeouts
+        return True, False, None
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        try:
+            return True, True, float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return True, True, None
+    return status in (408, 409) or (status or 0) >= 500, False, None
+
+def get_groq_api_key():
+    """Read the Groq API key from Streamlit secrets or the environment"""
+    # Try Streamlit secrets first (for deployment), then environment variable
+    api_key = None
+    if HAS_STREAMLIT:
+        try:
+            api_key = st.secrets.get("GROQ_API_KEY")
+        except:
+            pass
+    
+    if not api_key:
+        api_key = os.environ.get("GROQ_API_KEY")
+    return api_key
+
+# One sync client for every session in the process, so keep-alive connections (and their
+# TLS handshakes) are reused across users instead of each session opening its own pool
+GROQ_MAX_CONNECTIONS = int(os.environ.get("GROQ_MAX_CONNECTIONS", "100"))
+GROQ_HTTP2 = os.environ.get("GROQ_HTTP2", "1") == "1"
+
+_groq_client = None
+_groq_client_lock = threading.Lock()
+
+def make_groq_client(api_key, base_url=None, max_connections=GROQ_MAX_CONNECTIONS, http2=GROQ_HTTP2):
+    """Build a Groq client with a keep-alive pool of max_connections, over HTTP/2 when h2 is installed"""
+    import httpx
+    from groq import DefaultHttpxClient, Groq
+    
+    return Groq(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,  # retries go through the rate limiter instead
+        http_client=DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            http2=http2 and HAS_H2
+        )
+    )
+
+def get_groq_client():
+    """Return the process-wide Groq client, or None without an API key"""
+    global _groq_client
+    if _groq_client is None:
+        with _groq_client_lock:
+            if _groq_client is None:
+                api_key = get_groq_api_key()
+                if not api_key:
+                    return None
+                _groq_client = make_groq_client(api_key)
+    return _groq_client
+
+class LLMReply:
+    """A response segment generated by the LLM, with a canned fallback"""
+    
+    def __init__(self, prompt, fallback, suffix="", context=None, cache_key=None):
+        self.prompt = prompt
+        self.fallback = fallback
+        self.suffix = suffix
+        # Turn context captured when the reply was planned, before the state advances
+        self.context = context
+        # Cacheable replies are generated without user data or history so they can be shared
+        self.cache_key = cache_key
+        # Set by _prefetch: the request already in flight, when it was sent and its budget,
+        # and the queue its chunks arrive on (None-terminated; None if not streamed)
+        self.pending = None
+        self.started = None
+        self.budget = None
+        self.chunks = None
+
+class ChatbotEngine:
+    def __init__(self, inventory=None, llm_cache=None, fast_path=None):
+        self.state = "greeting"
+        self.user_data = {
+            "name": None,
+            "mood": None,
+            "selected_event_id": None,
+            "num_tickets": 1,
+            "email": None,
+            "ticket_id": None,
+            "hold_id": None
+        }
+        self.conversation_history = ConversationHistory()
+        self.last_user_message = ""
+        # Sessions keep event ids; the Event records live once in the shared catalog
+        self.current_event_ids = []
+        # The catalog snapshot for the turn in progress; None between turns
+        self._turn_catalog = None
+        # What was confirmed, kept as sold so a catalog reload can't change the ticket
+        self.booking = None
+        self.groq_client = None
+        self.inventory = inventory or get_inventory()
+        self.llm_cache = llm_cache or (get_llm_cache() if LLM_CACHE_ENABLED else None)
+        self.fast_path = FAST_PATH_ENABLED if fast_path is None else fast_path
+        self.rate_limiter = get_rate_limiter()
+        # Timings of the last turn that overlapped an LLM request with local work
+        self.turn_timings = {}
+        self._init_groq()
+        
+    def _has_llm(self):
+        """Whether this engine has a client to call the LLM with"""
+        return self.groq_client is not None
+    
+    def _init_groq(self):
+        """Use the shared Groq client"""
+        self.groq_client = get_groq_client()
         if not self.groq_client:
-            return None
-            
+            print("Warning: GROQ_API_KEY not found. Using fallback responses.")
+    
+    @property
+    def catalog(self):
+        """This turn's catalog snapshot, or the current catalog between turns"""
+        return get_catalog() if self._turn_catalog is None else self._turn_catalog
+    
+    @property
+    def current_events(self):
+        """The events on screen that are still in this turn's catalog"""
+        return [event for event in map(self.catalog.get, self.current_event_ids) if event is not None]
+    
+    @property
+    def selected_event(self):
+        """The event being booked, or None (also once a reload has removed it)"""
+        event_id = self.user_data["selected_event_id"]
+        return None if event_id is None else self.catalog.get(event_id)
+    
+    def _get_system_prompt(self, context=None):
+        """Get the system prompt for the AI"""
+        # Only the events relevant to this turn are listed, not the whole catalog
+        events, turn = context or self._get_turn_context()
+        return _PROMPT_HEAD + serialize_events_for_prompt(events, self.catalog.version) + _PROMPT_TAIL + "\n\n" + turn
+    
+    def _get_turn_context(self, neutral=False, events=None):
+        """Build the per-turn part of the system prompt as (events to list, state text)"""
+        if neutral:
+            # Shared (cached) replies must not depend on who is asking
+            return (events or self.catalog.events[:PROMPT_EVENT_LIMIT], f"""Current conversation state: {self.state}
+User data collected so far: {{}}
+Current events being shown: None""")
+        current = json.dumps([e.name for e in self.current_events]) if self.current_event_ids else "None"
+        user_data = {key: value for key, value in self.user_data.items() if key not in PROMPT_HIDDEN_USER_FIELDS}
+        return (self._select_prompt_events(), f"""Current conversation state: {self.state}
+User data collected so far: {json.dumps(user_data)}
+Current events being shown: {current}""")
+    
+    def _select_prompt_events(self):
+        """The selected event and the events on screen, topped up with the best matches for the user's words"""
+        chosen = {}
+        selected = self.selected_event
+        if selected:
+            chosen[selected.id] = selected
+        for event in self.current_events:
+            chosen.setdefault(event.id, event)
+        if len(chosen) < PROMPT_EVENT_LIMIT:
+            # Moods, categories and keywords all match through the BM25 index
+            moods = [mood for mood, _ in detect_moods(self.last_user_message)]
+            query = " ".join([self.last_user_message, self.user_data["mood"] or "", *moods])
+            for event in get_event_index().search(query, PROMPT_EVENT_LIMIT):
+                # The index may already be on a newer catalog than this turn
+                event = self.catalog.get(event.id)
+                if event is not None:
+                    chosen.setdefault(event.id, event)
+        events = list(chosen.values())[:PROMPT_EVENT_LIMIT]
+        return events or self.catalog.events[:PROMPT_EVENT_LIMIT]
+    
+    def _build_messages(self, user_message, context=None, history=True):
+        """Build the chat completion message list for a prompt"""
         messages = [
-            {"role": "system", "content": self._get_system_prompt()}
+            {"role": "system", "content": self._get_system_prompt(context)}
         ]
         
-        # Add conversation history (last 10 messages)
-        for msg in self.conversation_history[-10:]:
+        # Add conversation history (trimmed to its token budget, dropped turns summarized)
+        for msg in (self.conversation_history.messages() if history else []):
             messages.append({
-                "role": "user" if msg["role"] == "user" else "assistant",
+                "role": msg["role"] if msg["role"] in ("user", "system") else "assistant",
                 "content": msg["content"]
             })
         
         messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def _log_groq_error(self, e):
+        """Print a Groq API error, handling rate limits gracefully"""
+        error_str = str(e).lower()
+        if "rate_limit" in error_str or "429" in error_str:
+            print(f"API rate limit hit. Please wait a moment and try again.")
+        else:
+            print(f"Groq API error: {e}")
+    
+    def _reserve_tokens(self, messages):
+        """Tokens to hold in the rate limiter: the prompt estimate plus the completion limit"""
+        return sum(estimate_tokens(m["content"]) for m in messages) + GROQ_MAX_TOKENS
+    
+    def _settle_tokens(self, reserved, response):
+        """Give back what a finished request didn't use (streams report no usage and keep the reservation)"""
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.total_tokens is not None:
+            self.rate_limiter.refund(reserved - usage.total_tokens)
+    
+    def _retry_delay(self, error, attempt):
+        """Seconds to wait before retrying a failed request, or None to give up"""
+        retryable, rate_limited, retry_after = groq_retry_info(error)
+        if not retryable or attempt >= MAX_RETRIES:
+            if rate_limited:
+                self.rate_limiter.pause(backoff_delay(attempt, retry_after), retrying=False)
+            return None
+        delay = backoff_delay(attempt, retry_after)
+        if rate_limited:
+            # Every queued request waits out the server's limit, not just this one
+            self.rate_limiter.pause(delay)
+            return 0.0
+        return delay
+    
+    def _create_completion(self, messages, priority, **options):
+        """Create a completion through the rate limiter, retrying with backoff; None on failure"""
+        reserved = self._reserve_tokens(messages)
+        max_wait = RATE_LIMIT_MAX_WAIT if priority == PRIORITY_INTERACTIVE else None
+        for attempt in itertools.count():
+            if not self.rate_limiter.acquire(reserved, priority, max_wait):
+                print("LLM request waited too long for rate limit capacity; using the fallback.")
+                return None
+            try:
+                response = self.groq_client.chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=GROQ_MAX_TOKENS,
+                    timeout=10,  # 10 second timeout
+                    **options
+                )
+            except Exception as e:
+                # The failed attempt used no completion; the retry reserves its own tokens
+                self.rate_limiter.refund(reserved)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self._log_groq_error(e)
+                    return None
+                time.sleep(delay)
+                continue
+            self._settle_tokens(reserved, response)
+            return response
+    
+    def _call_groq(self, user_message, context=None, history=True, priority=PRIORITY_INTERACTIVE):
+        """Call Groq API for a response with timeout"""
+        if not self.groq_client:
+            return None
         
+        return self._complete_text(self._build_messages(user_message, context, history), priority)
+    
+    def _complete_text(self, messages, priority=PRIORITY_INTERACTIVE):
+        """Completion text for an already built message list, or None on failure"""
+        response = self._create_completion(messages, priority)
+        return response.choices[0].message.content if response else None
+    
+    def _stream_groq(self, user_message, context=None, history=True, priority=PRIORITY_INTERACTIVE):
+        """Call Groq API and yield content chunks as they arrive"""
+        if not self.groq_client:
+            return
+        
+        yield from self._stream_messages(self._build_messages(user_message, context, history), priority)
+    
+    def _stream_messages(self, messages, priority=PRIORITY_INTERACTIVE):
+        """Yield content chunks for an already built message list as they arrive"""
+        stream = self._create_completion(messages, priority, stream=True)
+        if stream is None:
+            return
         try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=400,
-                timeout=10  # 10 second timeout
-            )
-            return response.choices[0].message.content
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
-            error_str = str(e).lower()
-            # Handle rate limit gracefully
-            if "rate_limit" in error_str or "429" in error_str:
-                print(f"API rate limit hit. Please wait a moment and try again.")
+            self._log_groq_error(e)
+    
+    def _reply(self, prompt, fallback, suffix="", template=False):
+        """Plan an LLM segment using the current turn context
+        
+        template marks a deterministic transition: in fast path mode it is
+        answered with fallback + suffix, without building any prompt context.
+        """
+        if template and self.fast_path:
+            return fallback + suffix
+        # Without a client the fallback is used, so skip the prompt context (and its event search)
+        return LLMReply(prompt, fallback, suffix, self._get_turn_context() if self._has_llm() else None)
+    
+    def _cacheable_reply(self, cache_key, generic_prompt, fallback, suffix="", prompt=None, events=None, template=False):
+        """Plan an LLM segment that can be served from the response cache
+        
+        generic_prompt must not mention anything user specific; prompt is the
+        richer version used when caching is off. events (derived from the
+        cache key only) are listed in the prompt instead of the default set.
+        template is as for _reply.
+        """
+        if template and self.fast_path:
+            return fallback + suffix
+        if not self.llm_cache:
+            return self._reply(prompt or generic_prompt, fallback, suffix)
+        key = LLMResponseCache.make_key(*cache_key)
+        return LLMReply(generic_prompt, fallback, suffix, self._get_turn_context(neutral=True, events=events), key)
+    
+    def _cached_text(self, part):
+        """Cached reply for a cacheable segment, or None"""
+        if part.cache_key and self.llm_cache:
+            return self.llm_cache.get(part.cache_key)
+        return None
+    
+    def _remember(self, part, text):
+        """Add a freshly generated reply to the cache"""
+        if part.cache_key and self.llm_cache and text:
+            self.llm_cache.put(part.cache_key, text)
+    
+    def _prefetch(self, part, budget):
+        """Send an LLM segment's request now so it runs while the rest of the turn is prepared"""
+        part.started = time.perf_counter()
+        part.budget = budget
+        cached = self._cached_text(part)
+        if cached or not self.groq_client:
+            part.pending = Future()
+            part.pending.set_result(cached)
+        else:
+            # Messages are built here: by the time a pool thread runs the request the
+            # conversation history may already hold the reply or the next turn
+            messages = self._build_messages(part.prompt, part.context, not part.cache_key)
+            part.chunks = queue.Queue()
+            part.pending = get_prefetch_pool().submit(self._prefetch_stream, messages, part.chunks)
+            # A reply that misses the budget is still worth caching for the next user
+            part.pending.add_done_callback(lambda done: self._remember(part, done.result()))
+        return part
+    
+    def _prefetch_stream(self, messages, chunks):
+        """Stream a prefetched request, passing chunks on as they arrive; returns the whole text"""
+        text = []
+        try:
+            for chunk in self._stream_messages(messages):
+                text.append(chunk)
+                chunks.put(chunk)
+        finally:
+            chunks.put(None)
+        return "".join(text) or None
+    
+    def _collect_prefetch(self, part):
+        """Wait out the rest of a prefetched segment's budget; None if it ran late"""
+        waited = time.perf_counter()
+        timed_out = False
+        try:
+            response = part.pending.result(timeout=max(0.0, part.budget - (waited - part.started)))
+        except FutureTimeoutError:
+            response = None
+            timed_out = True
+            print(f"LLM reply missed its {part.budget:.1f}s budget; continuing without it.")
+        self._record_overlap(part, waited, timed_out, response is None)
+        return response
+    
+    def _record_overlap(self, part, waited, timed_out, empty):
+        """Report how much of the LLM round trip was hidden behind local work
+
+        timed_out: the reply was still pending at the deadline
+        empty: no text to show (timed out, failed, or no LLM client)
+        """
+        done = time.perf_counter()
+        lookup_ms = self.turn_timings.get("lookup_ms", 0.0)
+        llm_ms = (done - part.started) * 1000
+        self.turn_timings.update({
+            "llm_ms": llm_ms,
+            "wait_ms": (done - waited) * 1000,
+            "overlap_ms": min(lookup_ms, llm_ms),
+            "budget_missed": timed_out,
+            "llm_empty": empty
+        })
+    
+    def _render_reply(self, part):
+        """Resolve an LLMReply to text, falling back to its canned response"""
+        if part.pending is not None:
+            return (self._collect_prefetch(part) or part.fallback) + part.suffix
+        response = self._cached_text(part)
+        if not response:
+            response = self._call_groq(part.prompt, part.context, history=not part.cache_key)
+            self._remember(part, response)
+        return (response or part.fallback) + part.suffix
+    
+    def _stream_prefetched(self, part):
+        """Yield a prefetched segment's chunks as they arrive; the fallback if none came within its budget"""
+        if part.chunks is None:  # answered from the cache
+            yield (self._collect_prefetch(part) or part.fallback) + part.suffix
+            return
+        waited = time.perf_counter()
+        timed_out = False
+        try:
+            chunk = part.chunks.get(timeout=max(0.0, part.budget - (waited - part.started)))
+        except queue.Empty:
+            chunk = None
+            timed_out = True
+            print(f"LLM reply missed its {part.budget:.1f}s budget; continuing without it.")
+        self._record_overlap(part, waited, timed_out, chunk is None)
+        if chunk is None:
+            yield part.fallback + part.suffix
+            return
+        while chunk is not None:
+            yield chunk
+            chunk = part.chunks.get()
+        yield part.suffix
+    
+    def _stream_reply(self, part):
+        """Stream an LLMReply, emitting the fallback if the LLM produced nothing"""
+        if part.pending is not None:
+            yield from self._stream_prefetched(part)
+            return
+        cached = self._cached_text(part)
+        if cached:
+            yield cached
+        else:
+            chunks = []
+            for chunk in self._stream_groq(part.prompt, part.context, history=not part.cache_key):
+                chunks.append(chunk)
+                yield chunk
+            if chunks:
+                self._remember(part, "".join(chunks))
             else:
-                print(f"Groq API error: {e}")
-            return None
+                yield part.fallback
+        if part.suffix:
+            yield part.suffix
     
     def reset(self):
         """Reset the conversation state"""
+        self._release_hold()
         self.state = "greeting"
         self.user_data = {
             "name": None,
             "mood": None,
-            "selected_event": None,
+            "selected_event_id": None,
             "num_tickets": 1,
-            "email": None
+            "email": None,
+            "ticket_id": None,
+            "hold_id": None
         }
-        self.conversation_history = []
-        self.current_events = []
+        self.conversation_history.clear()
+        self.current_event_ids = []
+        self.booking = None
+    
+    def _greeting_reply(self):
+        """Greeting segment with its emergency fallback"""
+        return self._cacheable_reply(
+            ("greeting",),
+            "Generate a warm, concise greeting introducing yourself as TicketBot. Ask for the user's name. Keep it to 2-3 sentences max. No emojis.",
+            "Hello. I'm TicketBot.\n\nI help you discover events based on how you're feeling. What's your name?"
+        )
+    
+    def _mood_empathy_reply(self, mood):
+        """Empathy line shown above the events matching a detected mood"""
+        return self._cacheable_reply(
+            # Replies list and name events, so they are only reused within a catalog version
+            ("mood_empathy", mood, self.catalog.version),
+            f"The user is feeling {mood}. Respond with empathy in 1-2 sentences, then say you'll show them matching events. Keep it natural and warm. No emojis.",
+            f"I sense you're feeling {mood}. Here are some events that might be perfect:",
+            suffix="\n\n",
+            events=self.catalog.events_for_mood(mood, limit=PROMPT_EVENT_LIMIT)
+        )
+    
+    def _event_selected_reply(self, num, selected):
+        """Acknowledgement shown above the selected event's details"""
+        return self._cacheable_reply(
+            ("event_selected", selected.id, self.catalog.version),
+            f"The user selected {selected.name}. Acknowledge their choice positively in 1 sentence, then present the event details below it. No emojis.",
+            "Great choice!",
+            suffix="\n\n",
+            events=[selected],
+            prompt=f"The user selected event #{num}: {selected.name}. Acknowledge their choice positively in 1 sentence, then present the event details below it. No emojis."
+        )
+    
+    def _invalid_event_number_reply(self, user_input):
+        """Ask again for an event number within the listed range"""
+        count = len(self.current_event_ids)
+        return self._cacheable_reply(
+            ("invalid_event_number", count),
+            f"The user's reply isn't a valid event number (valid range: 1-{count}). Ask them politely to enter a valid number. Keep it brief. No emojis.",
+            f"Please enter a valid number between 1 and {count}.",
+            prompt=f"The user entered '{user_input}' which isn't a valid event number (valid range: 1-{count}). Ask them politely to enter a valid number. Keep it brief. No emojis.",
+            template=True
+        )
+    
+    def _invalid_ticket_count_reply(self, user_input):
+        """Ask again for a ticket count between 1 and 10"""
+        return self._cacheable_reply(
+            ("invalid_ticket_count",),
+            "The user's reply isn't a valid ticket count (must be 1-10). Ask them politely to enter a valid number. Keep it brief. No emojis.",
+            "Please enter a number between 1 and 10.",
+            prompt=f"The user entered '{user_input}' which isn't a valid ticket count (must be 1-10). Ask them politely to enter a valid number. Keep it brief. No emojis.",
+            template=True
+        )
+    
+    def _invalid_email_reply(self, user_input):
+        """Ask again for a valid email address"""
+        return self._cacheable_reply(
+            ("invalid_email",),
+            "The user's reply doesn't look like a valid email address. Ask them politely to provide a valid email (like name@example.com). Keep it brief. No emojis.",
+            "That doesn't look like a valid email. Please enter a valid email address (e.g., name@example.com):",
+            prompt=f"The user entered '{user_input}' which doesn't look like a valid email address. Ask them politely to provide a valid email (like name@example.com). Keep it brief. No emojis.",
+            template=True
+        )
     
     def get_greeting(self):
         """Return initial greeting message"""
-        response = self._call_groq("Generate a warm, concise greeting introducing yourself as TicketBot. Ask for the user's name. Keep it to 2-3 sentences max. No emojis.")
-        if response:
-            return response
-        
-        # Emergency fallback if API fails
-        return "Hello. I'm TicketBot.\n\nI help you discover events based on how you're feeling. What's your name?"
+        return self._render_reply(self._greeting_reply())
+    
+    def get_greeting_stream(self):
+        """Yield the initial greeting message in chunks"""
+        return self._stream_reply(self._greeting_reply())
     
     def detect_mood(self, text):
         """Detect mood from user input"""
-        text_lower = text.lower()
-        
-        mood_keywords = {
-            "excited": ["excited", "pumped", "thrilled", "can't wait", "hyped", "psyched", "stoked"],
-            "happy": ["happy", "great", "good", "wonderful", "fantastic", "amazing", "awesome", "joyful"],
-            "energetic": ["energetic", "energized", "active", "lively", "dynamic", "vibrant"],
-            "relaxed": ["relaxed", "chill", "calm", "peaceful", "easy", "laid back", "mellow"],
-            "stressed": ["stressed", "anxious", "worried", "overwhelmed", "pressure", "tense", "nervous"],
-            "sad": ["sad", "down", "upset", "unhappy", "depressed", "low", "blue", "heartbroken"],
-            "bored": ["bored", "boring", "nothing to do", "dull", "uninterested", "restless"],
-            "tired": ["tired", "exhausted", "sleepy", "drained", "fatigue", "worn out", "burnt out"],
-            "lonely": ["lonely", "alone", "isolated", "by myself", "need company"],
-            "curious": ["curious", "interested", "wondering", "explore", "want to learn", "intrigued"],
-            "creative": ["creative", "artistic", "artsy", "imaginative", "want to create"],
-            "motivated": ["motivated", "driven", "determined", "focused", "goal oriented"],
-            "adventurous": ["adventurous", "adventure", "explore", "new things", "try something new"],
-            "romantic": ["romantic", "love", "date", "partner", "couple"],
-            "social": ["social", "want to meet", "hang out", "make friends", "people", "party"],
-            "nostalgic": ["nostalgic", "memories", "old times", "remember", "throwback", "retro"],
-            "competitive": ["competitive", "want to win", "challenge", "beat", "compete"],
-            "playful": ["playful", "fun", "games", "play", "silly"]
-        }
-        
-        for mood, keywords in mood_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return mood
-        return None
+        moods = detect_moods(text)
+        return moods[0][0] if moods else None
+    
+    def detect_moods(self, text):
+        """Detect every mood in user input as (mood, score) pairs, best first"""
+        return detect_moods(text)
     
     def get_events_by_mood(self, mood):
         """Get events that match the user's mood"""
-        matching_events = []
-        for event in EVENTS:
-            if mood in event["mood"]:
-                matching_events.append(event)
+        return self.get_events_by_moods([mood])
+    
+    def get_events_by_moods(self, moods, limit=6):
+        """Get events ranked by how well they match the user's (mood, score) pairs"""
+        catalog = self.catalog
+        # Live seat counts: sold-out events are left out and the seat bonus follows sales
+        matching_events = catalog.rank_by_moods(moods, limit, seats=self.inventory.available_many)
         
         if not matching_events:
-            import random
-            matching_events = random.sample(EVENTS, min(5, len(EVENTS)))
+            matching_events = random.sample(catalog.events, min(5, len(catalog)))
         
-        return matching_events[:6]
+        return matching_events
     
     def extract_number(self, text):
         """Extract number from text"""
@@ -218,207 +754,610 @@ Keep responses SHORT - no more than 4-5 lines unless listing events."""
     
     def _format_events_list(self, events):
         """Format events list for display"""
+        seats = self.inventory.available_many(e.id for e in events)
         result = ""
         for i, event in enumerate(events, 1):
-            result += f"{i}. {event['name']}\n"
-            result += f"   {event['date']} at {event['time']}\n"
-            result += f"   {event['venue']}\n"
-            result += f"   ${event['price']:.2f} | {event['available_seats']} seats\n\n"
+            result += f"{i}. {event.name}\n"
+            result += f"   {event.date} at {event.time}\n"
+            result += f"   {event.venue}\n"
+            result += f"   ${event.price:.2f} | {seats.get(event.id, event.available_seats)} seats\n\n"
         return result
     
+    def _event_unavailable_parts(self):
+        """Response when the event being picked or booked was removed by a catalog reload"""
+        self._release_hold()
+        self.user_data["selected_event_id"] = None
+        events = self.current_events
+        if not events:
+            self.state = "mood_check"
+            return ["Sorry, that event is no longer available. How are you feeling? I'll find you something else."]
+        self.current_event_ids = [e.id for e in events]
+        self.state = "event_selection"
+        return [
+            "Sorry, that event is no longer available. Here is what's still on:\n\n",
+            self._format_events_list(events),
+            "Which event interests you? (Enter the number)"
+        ]
+    
+    def _release_hold(self):
+        """Give back seats held for a booking that wasn't completed"""
+        if self.user_data.get("hold_id"):
+            self.inventory.release(self.user_data["hold_id"])
+            self.user_data["hold_id"] = None
+    
+    def _confirm_hold(self):
+        """Confirm the seat hold, re-reserving if it expired; False if the seats are gone"""
+        hold_id = self.user_data["hold_id"]
+        if hold_id and self.inventory.confirm(hold_id):
+            return True
+        hold_id = self.inventory.reserve(self.user_data["selected_event_id"], self.user_data["num_tickets"])
+        self.user_data["hold_id"] = hold_id
+        return bool(hold_id) and self.inventory.confirm(hold_id)
+    
     def process_message(self, user_input):
         """Process user message and return bot response - All responses from Groq API"""
+        try:
+            parts = self._plan_response(user_input)
+            response = "".join(
+                self._render_reply(part) if isinstance(part, LLMReply) else part
+                for part in parts
+            )
+        finally:
+            self._turn_catalog = None
+        self.conversation_history.append({"role": "bot", "content": response})
+        return response
+    
+    def process_message_stream(self, user_input):
+        """Process user message and yield the bot response in chunks as it is generated"""
+        # State transitions happen up front; only the text is produced lazily
+        parts = self._plan_response(user_input)
+        return self._stream_parts(parts)
+    
+    def _stream_parts(self, parts):
+        """Yield template text immediately and LLM text as it streams in"""
+        chunks = []
+        try:
+            for part in parts:
+                if isinstance(part, LLMReply):
+                    for chunk in self._stream_reply(part):
+                        chunks.append(chunk)
+                        yield chunk
+                else:
+                    chunks.append(part)
+                    yield part
+        finally:
+            self._turn_catalog = None
+            self.conversation_history.append({"role": "bot", "content": "".join(chunks)})
+    
+    def _plan_response(self, user_input):
+        """Advance the state machine and return the response as template text and LLMReply segments"""
         user_input = user_input.strip()
         self.conversation_history.append({"role": "user", "content": user_input})
+        self.last_user_message = user_input
+        # Every lookup in this turn, including LLM prompts built later while streaming, uses one catalog
+        self._turn_catalog = get_catalog()
         
-        response = ""
+        parts = []
         
         if self.state == "greeting":
             self.user_data["name"] = user_input.split()[0].title() if user_input else "Friend"
             
             # Always use AI for response
-            ai_prompt = f"The user said their name is '{user_input}'. Greet them warmly using their name ({self.user_data['name']}), then explain your unique mood-based event recommendation feature, and ask how they're feeling today. Keep it conversational and under 4 sentences. No emojis."
-            response = self._call_groq(ai_prompt)
-            
-            if not response:  # Emergency fallback
-                response = f"Nice to meet you, {self.user_data['name']}. I recommend events based on your mood. How are you feeling today?"
+            parts.append(self._reply(
+                f"The user said their name is '{user_input}'. Greet them warmly using their name ({self.user_data['name']}), then explain your unique mood-based event recommendation feature, and ask how they're feeling today. Keep it conversational and under 4 sentences. No emojis.",
+                f"Nice to meet you, {self.user_data['name']}. I recommend events based on your mood. How are you feeling today?"
+            ))
             
             self.state = "mood_check"
             
         elif self.state == "mood_check":
-            detected_mood = self.detect_mood(user_input)
+            detected_moods = self.detect_moods(user_input)
             
-            if detected_mood:
+            if detected_moods:
+                detected_mood = detected_moods[0][0]
                 self.user_data["mood"] = detected_mood
-                matching_events = self.get_events_by_mood(detected_mood)
-                self.current_events = matching_events
-                
-                # Generate AI empathy response about the mood
-                ai_prompt = f"The user is feeling {detected_mood}. Respond with empathy in 1-2 sentences, then say you'll show them matching events. Keep it natural and warm. No emojis."
-                ai_empathy = self._call_groq(ai_prompt)
-                
-                if ai_empathy:
-                    response = ai_empathy + "\n\n"
-                else:
-                    response = f"I sense you're feeling {detected_mood}. Here are some events that might be perfect:\n\n"
                 
-                response += self._format_events_list(matching_events)
-                response += "Which event interests you? (Enter the number)"
+                # Send the empathy request first; ranking, seat checks and formatting run while it is in flight
+                parts.append(self._prefetch(self._mood_empathy_reply(detected_mood), EMPATHY_LATENCY_BUDGET))
+                lookup_start = time.perf_counter()
+                matching_events = self.get_events_by_moods(detected_moods)
+                self.current_event_ids = [e.id for e in matching_events]
+                parts.append(self._format_events_list(matching_events))
+                parts.append("Which event interests you? (Enter the number)")
+                self.turn_timings = {"lookup_ms": (time.perf_counter() - lookup_start) * 1000}
                 
                 self.state = "event_selection"
             else:
                 # Couldn't detect mood - ask AI to respond naturally
-                ai_prompt = f"The user said '{user_input}' but I couldn't detect a specific mood. Respond warmly saying you'll show them popular events. Keep it to 1-2 sentences. No emojis."
-                ai_response = self._call_groq(ai_prompt)
-                
-                self.current_events = EVENTS[:8]
-                
-                if ai_response:
-                    response = ai_response + "\n\n"
-                else:
-                    response = "I'd love to help you find the perfect event!\n\n"
+                popular_events = self.catalog.events[:8]
+                self.current_event_ids = [e.id for e in popular_events]
                 
-                response += self._format_events_list(self.current_events)
-                response += "Which one catches your interest? (Enter the number)"
+                parts.append(self._reply(
+                    f"The user said '{user_input}' but I couldn't detect a specific mood. Respond warmly saying you'll show them popular events. Keep it to 1-2 sentences. No emojis.",
+                    "I'd love to help you find the perfect event!",
+                    suffix="\n\n"
+                ))
+                parts.append(self._format_events_list(popular_events))
+                parts.append("Which one catches your interest? (Enter the number)")
                 self.state = "event_selection"
                 
         elif self.state == "event_selection":
             num = self.extract_number(user_input)
+            current_events = self.current_events
             
-            if num and 1 <= num <= len(self.current_events):
-                selected = self.current_events[num - 1]
-                self.user_data["selected_event"] = selected
+            if num and 1 <= num <= len(self.current_event_ids) and len(current_events) < len(self.current_event_ids):
+                # A reload removed some of the listed events; renumber what is left
+                parts.extend(self._event_unavailable_parts())
+            elif num and 1 <= num <= len(current_events):
+                selected = current_events[num - 1]
+                self.user_data["selected_event_id"] = selected.id
                 
                 # AI confirms selection and shows details
-                ai_prompt = f"The user selected event #{num}: {selected['name']}. Acknowledge their choice positively in 1 sentence, then present the event details below it. No emojis."
-                ai_intro = self._call_groq(ai_prompt)
+                parts.append(self._event_selected_reply(num, selected))
                 
-                if ai_intro:
-                    response = ai_intro + "\n\n"
-                else:
-                    response = "Great choice!\n\n"
-                
-                response += f"--- {selected['name']} ---\n\n"
-                response += f"{selected['description']}\n\n"
-                response += f"Date: {selected['date']}\n"
-                response += f"Time: {selected['time']}\n"
-                response += f"Venue: {selected['venue']}\n"
-                response += f"Price: ${selected['price']:.2f} per ticket\n\n"
-                response += "How many tickets would you like? (1-10)"
+                details = f"--- {selected.name} ---\n\n"
+                details += f"{selected.description}\n\n"
+                details += f"Date: {selected.date}\n"
+                details += f"Time: {selected.time}\n"
+                details += f"Venue: {selected.venue}\n"
+                details += f"Price: ${selected.price:.2f} per ticket\n\n"
+                details += "How many tickets would you like? (1-10)"
+                parts.append(details)
                 
                 self.state = "ticket_count"
             else:
                 # Invalid number - AI responds
-                ai_prompt = f"The user entered '{user_input}' which isn't a valid event number (valid range: 1-{len(self.current_events)}). Ask them politely to enter a valid number. Keep it brief. No emojis."
-                response = self._call_groq(ai_prompt)
-                
-                if not response:
-                    response = f"Please enter a valid number between 1 and {len(self.current_events)}."
+                parts.append(self._invalid_event_number_reply(user_input))
                 
         elif self.state == "ticket_count":
             num = self.extract_number(user_input)
-            event = self.user_data["selected_event"]
+            event = self.selected_event
             
-            if num and 1 <= num <= 10:
-                if num <= event["available_seats"]:
+            if event is None:
+                parts.extend(self._event_unavailable_parts())
+            elif num and 1 <= num <= 10:
+                # Hold the seats now; the hold expires if the email step is never completed
+                self._release_hold()
+                hold_id = self.inventory.reserve(event.id, num)
+                
+                if hold_id:
+                    self.user_data["hold_id"] = hold_id
                     self.user_data["num_tickets"] = num
-                    total = num * event["price"]
+                    total = num * event.price_cents / 100
                     
                     # AI confirms ticket count
-                    ai_prompt = f"The user wants {num} ticket(s) for {event['name']} at ${event['price']:.2f} each (total ${total:.2f}). Confirm this briefly and ask for their email address. 2 sentences max. No emojis."
-                    response = self._call_groq(ai_prompt)
-                    
-                    if not response:
-                        response = f"Got it. {num} ticket(s) for {event['name']}.\nTotal: ${total:.2f}\n\nPlease enter your email address:"
+                    parts.append(self._reply(
+                        f"The user wants {num} ticket(s) for {event.name} at ${event.price:.2f} each (total ${total:.2f}). Confirm this briefly and ask for their email address. 2 sentences max. No emojis.",
+                        f"Got it. {num} ticket(s) for {event.name}.\nTotal: ${total:.2f}\n\nPlease enter your email address:",
+                        template=True
+                    ))
                     
                     self.state = "email_collection"
                 else:
                     # Not enough seats - AI responds
-                    ai_prompt = f"Unfortunately only {event['available_seats']} seats are left, but the user requested {num}. Explain this politely and ask for a smaller number. Keep it brief. No emojis."
-                    response = self._call_groq(ai_prompt)
-                    
-                    if not response:
-                        response = f"Unfortunately, only {event['available_seats']} seats are left. Please enter a smaller number:"
+                    seats_left = self.inventory.available(event.id) or 0
+                    parts.append(self._reply(
+                        f"Unfortunately only {seats_left} seats are left, but the user requested {num}. Explain this politely and ask for a smaller number. Keep it brief. No emojis.",
+                        f"Unfortunately, only {seats_left} seats are left. Please enter a smaller number:",
+                        template=True
+                    ))
             else:
                 # Invalid number - AI responds
-                ai_prompt = f"The user entered '{user_input}' which isn't a valid ticket count (must be 1-10). Ask them politely to enter a valid number. Keep it brief. No emojis."
-                response = self._call_groq(ai_prompt)
-                
-                if not response:
-                    response = "Please enter a number between 1 and 10."
+                parts.append(self._invalid_ticket_count_reply(user_input))
                 
         elif self.state == "email_collection":
             email = self.extract_email(user_input)
             
-            if email:
+            if email and self.selected_event is None:
+                parts.extend(self._event_unavailable_parts())
+            elif email and not self._confirm_hold():
+                # The hold expired and the seats were sold in the meantime
+                event = self.selected_event
+                seats_left = self.inventory.available(event.id) or 0
+                parts.append(f"Sorry, the seats we were holding for {event.name} were released and only {seats_left} are left now. How many tickets would you like? (1-10)")
+                self.state = "ticket_count"
+            elif email:
                 self.user_data["email"] = email
-                event = self.user_data["selected_event"]
+                event = self.selected_event
                 num_tickets = self.user_data["num_tickets"]
-                total = num_tickets * event["price"]
+                total = num_tickets * event.price_cents / 100
+                
+                # Minted once per booking so every render and download shows the same ticket
+                self.user_data["ticket_id"] = generate_ticket_id({
+                    "name": self.user_data["name"],
+                    "event": event.name,
+                    "email": email
+                })
+                self.booking = {
+                    "ticket_id": self.user_data["ticket_id"],
+                    "name": self.user_data["name"],
+                    "email": email,
+                    "event": event.name,
+                    "date": event.date,
+                    "time": event.time,
+                    "venue": event.venue,
+                    "tickets": num_tickets,
+                    "total": total
+                }
                 
                 # Structured confirmation (keep this as is for clarity)
                 response = "--- BOOKING CONFIRMED ---\n\n"
-                response += f"Event: {event['name']}\n"
+                response += f"Ticket ID: {self.user_data['ticket_id']}\n"
+                response += f"Event: {event.name}\n"
                 response += f"Name: {self.user_data['name']}\n"
                 response += f"Email: {email}\n"
                 response += f"Tickets: {num_tickets}\n"
-                response += f"Date: {event['date']} at {event['time']}\n"
-                response += f"Venue: {event['venue']}\n"
+                response += f"Date: {event.date} at {event.time}\n"
+                response += f"Venue: {event.venue}\n"
                 response += f"Total: ${total:.2f}\n\n"
                 response += "Your QR code ticket has been generated.\nShow it at the venue entrance.\n\n"
                 response += "Would you like to book another event? (yes/no)"
+                parts.append(response)
                 self.state = "booking_complete"
             else:
                 # Invalid email - AI responds
-                ai_prompt = f"The user entered '{user_input}' which doesn't look like a valid email address. Ask them politely to provide a valid email (like name@example.com). Keep it brief. No emojis."
-                response = self._call_groq(ai_prompt)
-                
-                if not response:
-                    response = "That doesn't look like a valid email. Please enter a valid email address (e.g., name@example.com):"
+                parts.append(self._invalid_email_reply(user_input))
                 
         elif self.state == "booking_complete":
             positive_words = ["yes", "yeah", "sure", "yep", "another", "more", "definitely", "ok", "okay"]
             if any(word in user_input.lower() for word in positive_words):
                 # User wants another event - AI responds
-                ai_prompt = f"The user ({self.user_data['name']}) wants to book another event. Respond enthusiastically and ask about their current mood. Keep it to 2 sentences. No emojis."
-                response = self._call_groq(ai_prompt)
-                
-                if not response:
-                    response = f"Awesome, {self.user_data['name']}! How are you feeling now?"
+                parts.append(self._reply(
+                    f"The user ({self.user_data['name']}) wants to book another event. Respond enthusiastically and ask about their current mood. Keep it to 2 sentences. No emojis.",
+                    f"Awesome, {self.user_data['name']}! How are you feeling now?"
+                ))
                 
                 self.state = "mood_check"
-                self.user_data["selected_event"] = None
+                self.user_data["selected_event_id"] = None
                 self.user_data["num_tickets"] = 1
                 self.user_data["email"] = None
+                self.user_data["ticket_id"] = None
+                self.user_data["hold_id"] = None
+                self.booking = None
             else:
                 # User is done - AI says goodbye
-                ai_prompt = f"The user ({self.user_data['name']}) is done booking. Say a warm, friendly goodbye and wish them well at their event. Keep it to 2 sentences max. No emojis."
-                response = self._call_groq(ai_prompt)
-                
-                if not response:
-                    response = f"Thank you for using TicketBot, {self.user_data['name']}. Enjoy your event!"
+                parts.append(self._reply(
+                    f"The user ({self.user_data['name']}) is done booking. Say a warm, friendly goodbye and wish them well at their event. Keep it to 2 sentences max. No emojis.",
+                    f"Thank you for using TicketBot, {self.user_data['name']}. Enjoy your event!"
+                ))
                 
                 self.state = "ended"
                 
         elif self.state == "ended":
-            response = "Starting fresh...\n\n"
+            parts.append("Starting fresh...\n\n")
             self.reset()
-            response += self.get_greeting()
+            parts.append(self._greeting_reply())
             
-        self.conversation_history.append({"role": "bot", "content": response})
-        return response
+        return parts
     
     def get_booking_data(self):
         """Get current booking data for QR generation"""
-        if self.user_data["selected_event"] and self.user_data["email"]:
-            return {
-                "name": self.user_data["name"],
-                "email": self.user_data["email"],
-                "event": self.user_data["selected_event"]["name"],
-                "date": self.user_data["selected_event"]["date"],
-                "time": self.user_data["selected_event"]["time"],
-                "venue": self.user_data["selected_event"]["venue"],
-                "tickets": self.user_data["num_tickets"],
-                "total": self.user_data["num_tickets"] * self.user_data["selected_event"]["price"]
-            }
-        return None
+        # The details as confirmed, even if the event has since changed or left the catalog
+        return self.booking
+
+
+def _prewarm_jobs(engine, events):
+    """(state, events shown, reply builder) for every cacheable segment"""
+    catalog_events = engine.catalog.events
+    yield "greeting", [], engine._greeting_reply
+    for mood in MOOD_KEYWORDS:
+        yield "mood_check", [], lambda mood=mood: engine._mood_empathy_reply(mood)
+    for event in events:
+        yield "event_selection", [], lambda event=event: engine._event_selected_reply(1, event)
+    # Mood matches list up to 6 events, the no-mood fallback lists 8
+    for count in (6, 8):
+        yield "event_selection", catalog_events[:count], lambda: engine._invalid_event_number_reply("")
+    yield "ticket_count", [], lambda: engine._invalid_ticket_count_reply("")
+    yield "email_collection", [], lambda: engine._invalid_email_reply("")
+
+
+def _prewarm_events(engine, limit=PREWARM_EVENT_LIMIT):
+    """The event listed first for each mood, the likeliest picks, up to limit"""
+    chosen = {}
+    for mood in MOOD_KEYWORDS:
+        # Ranked as get_events_by_moods ranks them for users, live seat counts included
+        for event in engine.catalog.rank_by_moods([mood], limit=1, seats=engine.inventory.available_many):
+            chosen.setdefault(event.id, event)
+    return list(chosen.values())[:limit]
+
+
+def should_prewarm_llm_cache():
+    """Whether to pre-warm the LLM cache at startup (see LLM_CACHE_PREWARM)"""
+    if not LLM_CACHE_ENABLED or LLM_CACHE_PREWARM == "0":
+        return False
+    return LLM_CACHE_PREWARM == "1" or get_rate_limiter().enabled
+
+
+def prewarm_llm_cache(engine=None, events=None, delay=0.5):
+    """Fill the LLM response cache for the deterministic prompts
+
+    Meant to run once per process on a background thread. Calls queue behind
+    interactive turns in the rate limiter, which paces them when quotas are set
+    (otherwise `delay` seconds apart). events defaults to a few likely picks,
+    not the whole catalog. Stops at the first failed call and returns how many
+    replies were added.
+    """
+    engine = engine or ChatbotEngine()
+    cache = engine.llm_cache
+    if not cache or not engine.groq_client:
+        return 0
+    added = 0
+    # One catalog for the whole run, released when it ends
+    engine._turn_catalog = get_catalog()
+    try:
+        for state, shown, build in _prewarm_jobs(engine, _prewarm_events(engine) if events is None else events):
+            engine.state = state
+            engine.current_event_ids = [e.id for e in shown]
+            part = build()
+            if not isinstance(part, LLMReply):
+                continue  # answered from a template in fast path mode
+            while cache.needs_fill(part.cache_key):
+                text = engine._call_groq(part.prompt, part.context, history=False, priority=PRIORITY_PREWARM)
+                if not text:
+                    return added
+                cache.put(part.cache_key, text)
+                added += 1
+                if not engine.rate_limiter.enabled:
+                    time.sleep(delay)
+    finally:
+        engine._turn_catalog = None
+    return added
+
+
+# Async clients shared by every conversation on the event loop. httpcore's pool bookkeeping
+# grows with connections x waiting requests, so hundreds of in-flight calls are spread
+# over several smaller pools instead of one large one.
+ASYNC_MAX_CONNECTIONS = int(os.environ.get("GROQ_ASYNC_MAX_CONNECTIONS", "1000"))
+ASYNC_CLIENT_SHARDS = int(os.environ.get("GROQ_ASYNC_CLIENT_SHARDS", "16"))
+
+_async_groq_clients = None
+
+def make_async_groq_clients(api_key, base_url=None, max_connections=ASYNC_MAX_CONNECTIONS, shards=ASYNC_CLIENT_SHARDS):
+    """Build a cycle of AsyncGroq clients splitting max_connections between them"""
+    import httpx
+    from groq import AsyncGroq, DefaultAsyncHttpxClient
+    
+    per_shard = max(1, max_connections // shards)
+    return itertools.cycle([
+        AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # retries go through the rate limiter instead
+            http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                max_connections=per_shard,
+                max_keepalive_connections=per_shard
+            ))
+        )
+        for _ in range(shards)
+    ])
+
+def get_async_groq_client():
+    """Return an AsyncGroq client from the process-wide pool, or None without an API key"""
+    global _async_groq_clients
+    if _async_groq_clients is None:
+        api_key = get_groq_api_key()
+        if not api_key:
+            return None
+        _async_groq_clients = make_async_groq_clients(api_key)
+    return next(_async_groq_clients)
+
+class AsyncChatbotEngine(ChatbotEngine):
+    """ChatbotEngine whose LLM calls are awaitable, for serving many conversations from one event loop
+    
+    The state machine is shared with ChatbotEngine, so both produce the same
+    conversation. It runs on a worker thread so seat inventory transactions
+    don't block the loop, and LLM round trips are awaited on the loop.
+    """
+    
+    def __init__(self, inventory=None, async_client=None, fast_path=None):
+        self.async_groq_client = async_client or get_async_groq_client()
+        # The loop whose turn is being planned on a worker thread (see _plan_response_async)
+        self._loop = None
+        super().__init__(inventory=inventory, fast_path=fast_path)
+    
+    def _has_llm(self):
+        return self.async_groq_client is not None or super()._has_llm()
+    
+    def _init_groq(self):
+        """Only fall back to the sync client (and its warning) when there is no async client"""
+        if not self.async_groq_client:
+            super()._init_groq()
+    
+    async def _create_completion_async(self, messages, priority, **options):
+        """Create a completion through the rate limiter without blocking the event loop; None on failure"""
+        reserved = self._reserve_tokens(messages)
+        max_wait = RATE_LIMIT_MAX_WAIT if priority == PRIORITY_INTERACTIVE else None
+        for attempt in itertools.count():
+            if not await self.rate_limiter.acquire_async(reserved, priority, max_wait):
+                print("LLM request waited too long for rate limit capacity; using the fallback.")
+                return None
+            try:
+                response = await self.async_groq_client.chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=GROQ_MAX_TOKENS,
+                    timeout=10,
+                    **options
+                )
+            except Exception as e:
+                # The failed attempt used no completion; the retry reserves its own tokens
+                self.rate_limiter.refund(reserved)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self._log_groq_error(e)
+                    return None
+                await asyncio.sleep(delay)
+                continue
+            self._settle_tokens(reserved, response)
+            return response
+    
+    async def _call_groq_async(self, user_message, context=None, history=True, priority=PRIORITY_INTERACTIVE):
+        """Call Groq API for a response without blocking the event loop"""
+        if not self.async_groq_client:
+            return None
+        
+        return await self._complete_text_async(self._build_messages(user_message, context, history), priority)
+    
+    async def _complete_text_async(self, messages, priority=PRIORITY_INTERACTIVE):
+        """Completion text for an already built message list, or None on failure"""
+        response = await self._create_completion_async(messages, priority)
+        return response.choices[0].message.content if response else None
+    
+    async def _stream_groq_async(self, user_message, context=None, history=True, priority=PRIORITY_INTERACTIVE):
+        """Call Groq API and yield content chunks as they arrive"""
+        if not self.async_groq_client:
+            return
+        
+        async for chunk in self._stream_messages_async(self._build_messages(user_message, context, history), priority):
+            yield chunk
+    
+    async def _stream_messages_async(self, messages, priority=PRIORITY_INTERACTIVE):
+        """Yield content chunks for an already built message list as they arrive"""
+        stream = await self._create_completion_async(messages, priority, stream=True)
+        if stream is None:
+            return
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self._log_groq_error(e)
+    
+    async def _plan_response_async(self, user_input):
+        """Plan the turn on a worker thread: seat inventory calls are SQLite write transactions that can wait on locks"""
+        self._loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.to_thread(self._plan_response, user_input)
+        finally:
+            self._loop = None
+    
+    def _prefetch(self, part, budget):
+        """Send the request on the event loop planning this turn (sync callers get the threaded version)"""
+        loop = self._loop
+        if loop is None or not self.async_groq_client:
+            return super()._prefetch(part, budget)
+        part.started = time.perf_counter()
+        part.budget = budget
+        cached = self._cached_text(part)
+        if cached:
+            part.pending = Future()
+            part.pending.set_result(cached)
+        else:
+            # Built on the planning thread, before the loop can run this conversation's next step
+            messages = self._build_messages(part.prompt, part.context, not part.cache_key)
+            part.chunks = asyncio.Queue()
+            part.pending = asyncio.run_coroutine_threadsafe(self._prefetch_stream_async(messages, part.chunks), loop)
+            part.pending.add_done_callback(lambda done: done.cancelled() or self._remember(part, done.result()))
+        return part
+    
+    async def _prefetch_stream_async(self, messages, chunks):
+        """Stream a prefetched request, passing chunks on as they arrive; returns the whole text"""
+        text = []
+        try:
+            async for chunk in self._stream_messages_async(messages):
+                text.append(chunk)
+                chunks.put_nowait(chunk)
+        finally:
+            chunks.put_nowait(None)
+        return "".join(text) or None
+    
+    async def _stream_prefetched_async(self, part):
+        """Yield a prefetched segment's chunks as they arrive; the fallback if none came within its budget"""
+        if not isinstance(part.chunks, asyncio.Queue):  # answered from the cache or by the threaded version
+            yield await self._render_reply_async(part)
+            return
+        waited = time.perf_counter()
+        timed_out = False
+        try:
+            chunk = await asyncio.wait_for(part.chunks.get(), max(0.0, part.budget - (waited - part.started)))
+        except asyncio.TimeoutError:
+            chunk = None
+            timed_out = True
+            print(f"LLM reply missed its {part.budget:.1f}s budget; continuing without it.")
+        self._record_overlap(part, waited, timed_out, chunk is None)
+        if chunk is None:
+            yield part.fallback + part.suffix
+            return
+        while chunk is not None:
+            yield chunk
+            chunk = await part.chunks.get()
+        yield part.suffix
+    
+    async def _collect_prefetch_async(self, part):
+        """Await the rest of a prefetched segment's budget; None if it ran late"""
+        waited = time.perf_counter()
+        timed_out = False
+        try:
+            # Shielded so a late reply still completes and lands in the cache
+            pending = asyncio.wrap_future(part.pending)
+            response = await asyncio.wait_for(asyncio.shield(pending), max(0.0, part.budget - (waited - part.started)))
+        except asyncio.TimeoutError:
+            response = None
+            timed_out = True
+            print(f"LLM reply missed its {part.budget:.1f}s budget; continuing without it.")
+        self._record_overlap(part, waited, timed_out, response is None)
+        return response
+    
+    async def _render_reply_async(self, part):
+        if part.pending is not None:
+            return (await self._collect_prefetch_async(part) or part.fallback) + part.suffix
+        response = self._cached_text(part)
+        if not response:
+            response = await self._call_groq_async(part.prompt, part.context, history=not part.cache_key)
+            self._remember(part, response)
+        return (response or part.fallback) + part.suffix
+    
+    async def get_greeting_async(self):
+        """Return initial greeting message"""
+        return await self._render_reply_async(self._greeting_reply())
+    
+    async def process_message_async(self, user_input):
+        """Process user message and return bot response"""
+        try:
+            parts = await self._plan_response_async(user_input)
+            texts = []
+            for part in parts:
+                texts.append(await self._render_reply_async(part) if isinstance(part, LLMReply) else part)
+        finally:
+            self._turn_catalog = None
+        response = "".join(texts)
+        self.conversation_history.append({"role": "bot", "content": response})
+        return response
+    
+    async def process_message_stream_async(self, user_input):
+        """Process user message and yield the bot response in chunks as it is generated"""
+        parts = await self._plan_response_async(user_input)
+        chunks = []
+        try:
+            for part in parts:
+                if not isinstance(part, LLMReply):
+                    chunks.append(part)
+                    yield part
+                    continue
+                if part.pending is not None:
+                    async for chunk in self._stream_prefetched_async(part):
+                        chunks.append(chunk)
+                        yield chunk
+                    continue
+                cached = self._cached_text(part)
+                if cached:
+                    chunks.append(cached)
+                    yield cached
+                else:
+                    generated = []
+                    async for chunk in self._stream_groq_async(part.prompt, part.context, history=not part.cache_key):
+                        generated.append(chunk)
+                        chunks.append(chunk)
+                        yield chunk
+                    if generated:
+                        self._remember(part, "".join(generated))
+                    else:
+                        chunks.append(part.fallback)
+                        yield part.fallback
+                if part.suffix:
+                    chunks.append(part.suffix)
+                    yield part.suffix
+        finally:
+            self._turn_catalog = None
+            self.conversation_history.append({"role": "bot", "content": "".join(chunks)})
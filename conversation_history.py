@@ -0,0 +1,88 @@
+"""
+Conversation History - Bounded, token-budgeted message store for a chat session
+Messages live in a ring buffer and the oldest are dropped once the estimated
+token total passes the budget, so a long session holds a fixed amount of
+history. Dropped turns can optionally be folded into one short summary message.
+"""
+
+import os
+from collections import deque
+
+HISTORY_TOKEN_BUDGET = int(os.environ.get("TICKETBOT_HISTORY_TOKENS", "1500"))
+HISTORY_MAX_MESSAGES = int(os.environ.get("TICKETBOT_HISTORY_MAX_MESSAGES", "50"))
+HISTORY_SUMMARIZE = os.environ.get("TICKETBOT_HISTORY_SUMMARY", "0") == "1"
+
+# Budget for the summary of dropped turns, and how much of each dropped turn it keeps
+SUMMARY_TOKEN_BUDGET = 120
+SUMMARY_SNIPPET_CHARS = 80
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English text)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+class ConversationHistory:
+    """Ring buffer of {"role", "content"} messages trimmed to a token budget"""
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, max_messages=HISTORY_MAX_MESSAGES, summarize=HISTORY_SUMMARIZE):
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self._messages = deque(maxlen=max_messages)  # (message, tokens)
+        self._tokens = 0
+        self._summary = deque()  # (snippet, tokens) for dropped turns, oldest first
+        self._summary_tokens = 0
+
+    def append(self, message):
+        """Add a message, dropping the oldest ones that no longer fit"""
+        tokens = estimate_tokens(message["content"])
+        if len(self._messages) == self._messages.maxlen:
+            self._drop(self._messages.popleft())
+        self._messages.append((message, tokens))
+        self._tokens += tokens
+        # Always keep the newest message, even if it alone is over budget
+        while self._tokens > self.token_budget and len(self._messages) > 1:
+            self._drop(self._messages.popleft())
+
+    def _drop(self, entry):
+        message, tokens = entry
+        self._tokens -= tokens
+        if not self.summarize:
+            return
+        speaker = "User" if message["role"] == "user" else "Bot"
+        first_line = message["content"].strip().split("\n", 1)[0][:SUMMARY_SNIPPET_CHARS]
+        snippet = f"{speaker}: {first_line}"
+        snippet_tokens = estimate_tokens(snippet)
+        self._summary.append((snippet, snippet_tokens))
+        self._summary_tokens += snippet_tokens
+        while self._summary_tokens > SUMMARY_TOKEN_BUDGET and len(self._summary) > 1:
+            self._summary_tokens -= self._summary.popleft()[1]
+
+    def summary(self):
+        """One compact message covering dropped turns, or None"""
+        if not self._summary:
+            return None
+        return {"role": "system", "content": "Earlier in this conversation: " + " | ".join(s for s, _ in self._summary)}
+
+    def messages(self):
+        """Messages to send to the model: the summary (if any) then the retained turns"""
+        summary = self.summary()
+        retained = [message for message, _ in self._messages]
+        return [summary] + retained if summary else retained
+
+    def clear(self):
+        self._messages.clear()
+        self._tokens = 0
+        self._summary.clear()
+        self._summary_tokens = 0
+
+    @property
+    def tokens(self):
+        """Estimated tokens currently retained (excluding the summary)"""
+        return self._tokens
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return (message for message, _ in self._messages)
@@ -0,0 +1,109 @@
+"""
+Event Retrieval - Offline BM25 search over the event catalog
+Picks the few events relevant to a conversation turn so LLM prompts stay the
+same size however large the catalog grows. The index is built once per
+catalog version, before that catalog is served.
+"""
+
+import heapq
+import math
+import re
+import threading
+
+from event_store import TEXT_FIELDS, StoredEvent
+from events_data import get_catalog, on_catalog_reload
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A term in the name, category or moods says more about an event than one in its description
+FIELD_WEIGHTS = (("name", 2), ("category", 2), ("mood", 2), ("venue", 1), ("description", 1))
+# Events from a compiled catalog keep their text in the file until shown, so only these are indexed for them
+STORED_FIELD_WEIGHTS = tuple((field, weight) for field, weight in FIELD_WEIGHTS if field not in TEXT_FIELDS)
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from i im i'm in is it its me my of on or so that the this to
+was we with you your feel feeling felt today really very just am
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens with stop words removed"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class EventIndex:
+    """BM25 index over one catalog version"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.version = catalog.version
+        postings = {}  # term -> [(position, weighted term frequency)]
+        lengths = []
+        terms = {}  # categories and moods repeat across events, so each is tokenized once
+        for position, event in enumerate(catalog.events):
+            counts = {}
+            for field, weight in (STORED_FIELD_WEIGHTS if isinstance(event, StoredEvent) else FIELD_WEIGHTS):
+                value = getattr(event, field)
+                for text in (value if isinstance(value, tuple) else (value,)):
+                    if field in TEXT_FIELDS:
+                        tokens = tokenize(str(text))
+                    else:
+                        tokens = terms.get(text)
+                        if tokens is None:
+                            tokens = terms[text] = tokenize(str(text))
+                    for term in tokens:
+                        counts[term] = counts.get(term, 0) + weight
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((position, tf))
+
+        n = len(lengths)
+        average = sum(lengths) / n if n else 1.0
+        # Store the finished per-posting BM25 weight so a query is just additions
+        self._postings = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = [
+                (position, idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[position] / average)))
+                for position, tf in entries
+            ]
+
+    def search(self, query, limit=8):
+        """Events best matching the query text, best first; [] when nothing matches"""
+        scores = {}
+        for term in set(tokenize(query)):
+            for position, weight in self._postings.get(term, ()):
+                scores[position] = scores.get(position, 0.0) + weight
+        # Ties go to catalog order so results are stable between calls
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        events = self.catalog.events
+        return [events[position] for position, _ in best]
+
+
+_index = None
+_next_index = None  # built for each new catalog before it is swapped in
+_index_lock = threading.Lock()
+
+
+def get_event_index():
+    """EventIndex for the current catalog version"""
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != catalog.version:
+                ready = _next_index
+                index = _index = ready if ready is not None and ready.version == catalog.version else EventIndex(catalog)
+    return index
+
+
+@on_catalog_reload
+def _index_reloaded_catalog(catalog):
+    """Build each new catalog's index on the loading thread, so no turn waits for it"""
+    global _next_index
+    _next_index = EventIndex(catalog)
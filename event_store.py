@@ -0,0 +1,278 @@
+"""
+On-disk event catalogs
+Events are authored as JSON Lines, one event dict per line shaped like the
+rows in events_data.EVENTS, and compiled into a columnar file that is opened
+with mmap. Ids, mood masks, categories, dates, times, prices and seats are
+fixed-width columns read straight from the map; names, venues and
+descriptions stay encoded in the file until an event is displayed.
+
+    python event_store.py compile events.jsonl events.tcat
+    python event_store.py export events.jsonl   # the built-in EVENTS, as a starting point
+
+Point TICKETBOT_EVENTS_FILE at either file to serve it instead of the built-in events.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+
+from events_data import EVENTS, Event, known_moods, mood_mask
+
+MAGIC = b"TCAT"
+FORMAT_VERSION = 1
+TEXT_FIELDS = ("name", "venue", "description")
+
+# Fixed-width columns: name -> array typecode (int64, uint32 table index, ...)
+COLUMNS = {"id": "q", "category": "I", "date": "I", "time": "I", "price_cents": "q", "available_seats": "q"}
+
+_HEADER = array("I", [0, 0])  # format version, header JSON length; follows MAGIC
+
+(_set_id, _set_category, _set_mood_mask, _set_date, _set_time, _set_price_cents, _set_available_seats) = (
+    getattr(Event, field).__set__
+    for field in ("id", "category", "mood_mask", "date", "time", "price_cents", "available_seats")
+)
+
+
+class StoredEvent(Event):
+    """An Event backed by a compiled catalog file; name, venue and description are decoded on each access"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row, id, category, mood_mask, date, time, price_cents, available_seats):
+        _set_id(self, id)
+        _set_category(self, category)
+        _set_mood_mask(self, mood_mask)
+        _set_date(self, date)
+        _set_time(self, time)
+        _set_price_cents(self, price_cents)
+        _set_available_seats(self, available_seats)
+        _set_store(self, store)
+        _set_row(self, row)
+
+    @property
+    def name(self):
+        return self._store.text("name", self._row)
+
+    @property
+    def venue(self):
+        return self._store.text("venue", self._row)
+
+    @property
+    def description(self):
+        return self._store.text("description", self._row)
+
+
+_set_store, _set_row = StoredEvent._store.__set__, StoredEvent._row.__set__
+
+
+class CatalogFile:
+    """A compiled catalog opened with mmap; columns are memoryviews into the map"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != "little":
+            raise ValueError("Compiled catalogs are little-endian; rebuild from JSON Lines on this machine")
+        if self._map[:4] != MAGIC:
+            raise ValueError(f"{path} is not a compiled event catalog")
+        if len(self._map) < 12:
+            raise ValueError(f"{path} is truncated")
+        version, header_length = memoryview(self._map)[4:12].cast("I")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has catalog format {version}, expected {FORMAT_VERSION}; recompile it")
+        if 12 + header_length > len(self._map):
+            raise ValueError(f"{path} is truncated inside its header")
+        try:
+            header = json.loads(self._map[12:12 + header_length])
+            self.count = header["count"]
+            self.moods = header["moods"]
+            # Table strings are few and repeated, so they are decoded and interned once here
+            self.tables = {field: [sys.intern(value) for value in values] for field, values in header["tables"].items()}
+            self._sections = header["sections"]
+            self._check_sections()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path} is not a valid compiled catalog ({e!r})") from None
+        self._offsets = {field: self._column(f"{field}_offsets") for field in TEXT_FIELDS}
+        self._texts = {field: self._column(f"{field}_text") for field in TEXT_FIELDS}
+
+    def _check_sections(self):
+        """Raise ValueError unless every section lies inside the map and every column holds count rows"""
+        size = len(self._map)
+        for section, (offset, length, typecode) in self._sections.items():
+            if offset < 0 or length < 0 or offset + length > size:
+                raise ValueError(f"section {section} runs past the end of the file ({size} bytes)")
+            if length % array(typecode).itemsize:
+                raise ValueError(f"section {section} is not a whole number of {typecode!r} items")
+        rows = dict.fromkeys(COLUMNS, self.count)
+        rows.update((f"mood_{word}", self.count) for word in range((len(self.moods) + 63) // 64))
+        rows.update((f"{field}_offsets", self.count + 1) for field in TEXT_FIELDS)
+        for section, expected in rows.items():
+            if len(self._column(section)) != expected:
+                raise ValueError(f"section {section} has {len(self._column(section))} rows, expected {expected}")
+        for field in TEXT_FIELDS:
+            if self._column(f"{field}_offsets")[-1] != len(self._column(f"{field}_text")):
+                raise ValueError(f"section {field}_text does not match its offsets")
+
+    def _column(self, section):
+        offset, length, typecode = self._sections[section]
+        return memoryview(self._map)[offset:offset + length].cast(typecode)
+
+    def text(self, field, row):
+        """Decode one event's name, venue or description from the map"""
+        offsets = self._offsets[field]
+        return str(self._texts[field][offsets[row]:offsets[row + 1]], "utf-8")
+
+    def mood_masks(self):
+        """Mood masks in this process's bit order (a file written elsewhere may number moods differently)"""
+        words = [self._column(f"mood_{word}") for word in range((len(self.moods) + 63) // 64)]
+        masks = words[0] if len(words) == 1 else (
+            sum(value << 64 * word for word, value in enumerate(values)) for values in zip(*words)
+        )
+        bits = [mood_mask([mood]) for mood in self.moods]
+        if all(bit == 1 << position for position, bit in enumerate(bits)):
+            return masks
+
+        remapped = {}
+
+        def remap(mask):
+            if mask not in remapped:
+                remapped[mask] = sum(bit for position, bit in enumerate(bits) if mask >> position & 1)
+            return remapped[mask]
+        return map(remap, masks)
+
+    def events(self):
+        """A StoredEvent per row, in file order"""
+        categories, dates, times = self.tables["category"], self.tables["date"], self.tables["time"]
+        columns = zip(
+            self._column("id"), self.mood_masks(), self._column("category"), self._column("date"),
+            self._column("time"), self._column("price_cents"), self._column("available_seats")
+        )
+        return [
+            StoredEvent(self, row, event_id, categories[category], mask, dates[date], times[time_of_day], cents, seats)
+            for row, (event_id, mask, category, date, time_of_day, cents, seats) in enumerate(columns)
+        ]
+
+
+def read_jsonl(path):
+    """Yield an Event per non-blank line of a JSON Lines file"""
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield Event.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: not a valid event ({e!r})") from None
+
+
+def load_events(path):
+    """Events from a compiled catalog or a JSON Lines file, told apart by the file's first bytes"""
+    with open(path, "rb") as file:
+        compiled = file.read(len(MAGIC)) == MAGIC
+    if compiled:
+        catalog = CatalogFile(path)
+        events = catalog.events()
+        if len(events) != catalog.count:
+            raise ValueError(f"{path} holds {len(events)} events, its header says {catalog.count}")
+        return events
+    return list(read_jsonl(path))
+
+
+def compile_catalog(events, output):
+    """Write events (Event records or dict rows) to a compiled catalog file; returns the event count
+
+    The file is written next to output and renamed over it, so a server
+    reading the old file never sees a partial one.
+    """
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    tables = {"category": {}, "date": {}, "time": {}}
+    offsets = {field: array("Q", [0]) for field in TEXT_FIELDS}
+    texts = {field: bytearray() for field in TEXT_FIELDS}
+    masks = []
+
+    for event in events:
+        if not isinstance(event, Event):
+            event = Event.from_dict(event)
+        columns["id"].append(event.id)
+        columns["price_cents"].append(event.price_cents)
+        columns["available_seats"].append(event.available_seats)
+        for field, table in tables.items():
+            value = getattr(event, field)
+            columns[field].append(table.setdefault(value, len(table)))
+        for field in TEXT_FIELDS:
+            texts[field] += getattr(event, field).encode("utf-8")
+            offsets[field].append(len(texts[field]))
+        masks.append(event.mood_mask)
+
+    # Masks are written in this process's bit order, split into 64-bit words
+    moods = known_moods()
+    sections = {f"mood_{word}": array("Q", [(mask >> 64 * word) & 0xFFFFFFFFFFFFFFFF for mask in masks])
+                for word in range((len(moods) + 63) // 64)}
+    sections.update(columns)
+    for field in TEXT_FIELDS:
+        sections[f"{field}_offsets"] = offsets[field]
+        sections[f"{field}_text"] = texts[field]
+
+    # Section offsets depend on the header length, so lay out until it stops changing
+    header, layout, start = None, {}, 0
+    while True:
+        position = _align(len(MAGIC) + _HEADER.itemsize * len(_HEADER) + len(header or b""))
+        if position == start and header is not None:
+            break
+        start, layout = position, {}
+        for name, data in sections.items():
+            length = len(data) * getattr(data, "itemsize", 1)
+            layout[name] = [position, length, getattr(data, "typecode", "B")]
+            position = _align(position + length)
+        header = json.dumps({
+            "count": len(masks), "moods": moods,
+            "tables": {field: list(table) for field, table in tables.items()},
+            "sections": layout
+        }).encode("utf-8")
+
+    temp_path = f"{output}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(array("I", [FORMAT_VERSION, len(header)]).tobytes())
+        file.write(header)
+        for name, data in sections.items():
+            file.write(b"\0" * (layout[name][0] - file.tell()))
+            file.write(data)
+    os.replace(temp_path, output)
+    return len(masks)
+
+
+def _align(position):
+    return (position + 7) // 8 * 8
+
+
+def main(argv=None):
+    """Command line entry point for compiling and exporting catalogs"""
+    parser = argparse.ArgumentParser(description="Compile a JSON Lines event catalog for TICKETBOT_EVENTS_FILE.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="compile a JSON Lines catalog into a memory-mapped file")
+    compile_parser.add_argument("source", help="JSON Lines file, one event dict per line")
+    compile_parser.add_argument("output", help="compiled catalog to write (replaced atomically)")
+    export_parser = commands.add_parser("export", help="write the built-in events as JSON Lines")
+    export_parser.add_argument("output", help="JSON Lines file to write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "compile":
+        count = compile_catalog(read_jsonl(args.source), args.output)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            for event in EVENTS:
+                file.write(json.dumps(event.to_dict()) + "\n")
+        count = len(EVENTS)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} events to {args.output} in {elapsed:.2f}s ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,176 @@
 """
 Sample events database for the Event Ticketing Chatbot
 Extended with more events and mood associations
+
+Events are immutable Event records, stored once per process and shared by
+every session; sessions refer to them by id.
 """
 
-EVENTS = [
+import heapq
+import importlib.util
+import itertools
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+# Bumped whenever EVENTS is modified so derived caches (prompts, indexes) rebuild
+_catalog_version = 0
+_versions = itertools.count(1)  # handed out in order, so a newer catalog always has a higher version
+
+# Mood ranking: score = moods matched + seat bonus + date bonus. The bonuses
+# add up to less than 1, so they only order events that match as many moods.
+# The seat bonus is seats left over the most listed by any event
+RANK_SEAT_WEIGHT = float(os.environ.get("TICKETBOT_RANK_SEAT_WEIGHT", "0.25"))
+RANK_DATE_WEIGHT = float(os.environ.get("TICKETBOT_RANK_DATE_WEIGHT", "0.5"))
+RANK_DATE_HORIZON_DAYS = int(os.environ.get("TICKETBOT_RANK_DATE_HORIZON_DAYS", "90"))  # date bonus fades to 0 by then
+
+# Most events rescored with live seat counts per query; past this, fewer than the limit may come back
+RANK_LIVE_MAX_CANDIDATES = 1024
+
+# Catalogs this large rank with NumPy (optional; imported on first use) instead of posting lists
+VECTOR_RANK_MIN_EVENTS = int(os.environ.get("TICKETBOT_VECTOR_RANK_MIN_EVENTS", "5000"))
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# Serve events from a JSON Lines file or a compiled catalog (see event_store.py)
+# instead of the built-in EVENTS below; read on the first get_catalog()
+EVENTS_FILE = os.environ.get("TICKETBOT_EVENTS_FILE", "")
+# Seconds between checks of EVENTS_FILE for changes; 0 turns hot reload off
+CATALOG_POLL_SECONDS = float(os.environ.get("TICKETBOT_CATALOG_POLL_SECONDS", "2"))
+
+MOODS = [
+    "excited", "happy", "relaxed", "stressed", "sad", "bored", 
+    "curious", "motivated", "tired", "adventurous", "romantic",
+    "playful", "creative", "peaceful", "nostalgic", "ambitious",
+    "anxious", "overwhelmed", "energetic", "calm", "lonely",
+    "inspired", "confident", "social", "introspective", "wild",
+    "mellow", "determined", "artistic", "intellectual", "spiritual",
+    "burnt out", "exhausted", "hyped", "pumped", "competitive",
+    "contemplative", "emotional", "expressive", "celebratory", "free"
+]
+
+CATEGORIES = [
+    "technology", "music", "business", "wellness", "gaming", 
+    "food", "art", "comedy", "social", "entertainment", "sports"
+]
+
+# One bit per mood, MOODS first; moods outside MOODS get the next free bit
+_mood_bits = {sys.intern(mood): 1 << bit for bit, mood in enumerate(MOODS)}
+_mood_names = {bit: mood for mood, bit in _mood_bits.items()}
+_mood_lock = threading.Lock()
+
+
+def mood_mask(moods):
+    """Bitmask with a bit set for each mood"""
+    mask = 0
+    for mood in moods:
+        bit = _mood_bits.get(mood)
+        if bit is None:
+            with _mood_lock:
+                bit = _mood_bits.get(mood)
+                if bit is None:
+                    mood = sys.intern(mood)
+                    bit = _mood_bits[mood] = 1 << len(_mood_bits)
+                    _mood_names[bit] = mood
+        mask |= bit
+    return mask
+
+
+def known_moods():
+    """Every mood that has a bit, in bit order"""
+    return list(_mood_bits)
+
+
+def moods_in(mask):
+    """The moods in a mask as a tuple of interned strings, in MOODS order"""
+    moods = []
+    while mask:
+        bit = mask & -mask
+        moods.append(_mood_names[bit])
+        mask ^= bit
+    return tuple(moods)
+
+
+class Event:
+    """One catalog entry: immutable, with interned strings, moods as a bitmask and the price in cents
+    
+    Read fields as attributes. event["field"] also works, for code written
+    against the old dict rows; to_dict() gives that row shape back.
+    """
+    
+    __slots__ = ("id", "name", "category", "mood_mask", "date", "time", "venue", "price_cents", "available_seats", "description")
+    
+    def __init__(self, id, name, category, mood_mask, date, time, venue, price_cents, available_seats, description):
+        # Slot descriptors (bound below the class) get past the immutable __setattr__
+        _set_id(self, id)
+        _set_name(self, name)
+        # Short, repeated strings are interned so 100k events share one copy of each
+        _set_category(self, sys.intern(category))
+        _set_mood_mask(self, mood_mask)
+        _set_date(self, sys.intern(date))
+        _set_time(self, sys.intern(time))
+        _set_venue(self, sys.intern(venue))
+        _set_price_cents(self, price_cents)
+        _set_available_seats(self, available_seats)
+        _set_description(self, description)
+    
+    @classmethod
+    def from_dict(cls, row):
+        """Build an Event from a dict row (price in dollars, mood as a list of strings)"""
+        return cls(
+            row["id"], row["name"], row["category"], mood_mask(row["mood"]), row["date"], row["time"],
+            row["venue"], round(row["price"] * 100), row["available_seats"], row["description"]
+        )
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Event is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Event is immutable")
+    
+    @property
+    def mood(self):
+        return moods_in(self.mood_mask)
+    
+    @property
+    def price(self):
+        """Price in dollars, for display"""
+        return self.price_cents / 100
+    
+    def has_mood(self, mood):
+        return bool(self.mood_mask & _mood_bits.get(mood, 0))
+    
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+    
+    def to_dict(self):
+        return {
+            "id": self.id, "name": self.name, "category": self.category, "mood": list(self.mood),
+            "date": self.date, "time": self.time, "venue": self.venue, "price": self.price,
+            "available_seats": self.available_seats, "description": self.description
+        }
+    
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in Event.__slots__)
+    
+    def __hash__(self):
+        return hash(self.id)
+    
+    def __repr__(self):
+        return f"Event(id={self.id!r}, name={self.name!r})"
+
+
+(_set_id, _set_name, _set_category, _set_mood_mask, _set_date, _set_time, _set_venue,
+ _set_price_cents, _set_available_seats, _set_description) = (getattr(Event, field).__set__ for field in Event.__slots__)
+
+
+EVENTS = [Event.from_dict(row) for row in [
     {
         "id": 1,
         "name": "Tech Innovators Summit 2026",
@@ -244,20 +411,388 @@ EVENTS = [
         "available_seats": 150,
         "description": "Dance the night away with stunning city views and top DJs."
     }
-]
+]]
 
-MOODS = [
-    "excited", "happy", "relaxed", "stressed", "sad", "bored", 
-    "curious", "motivated", "tired", "adventurous", "romantic",
-    "playful", "creative", "peaceful", "nostalgic", "ambitious",
-    "anxious", "overwhelmed", "energetic", "calm", "lonely",
-    "inspired", "confident", "social", "introspective", "wild",
-    "mellow", "determined", "artistic", "intellectual", "spiritual",
-    "burnt out", "exhausted", "hyped", "pumped", "competitive",
-    "contemplative", "emotional", "expressive", "celebratory", "free"
-]
 
-CATEGORIES = [
-    "technology", "music", "business", "wellness", "gaming", 
-    "food", "art", "comedy", "social", "entertainment", "sports"
-]
+class EventCatalog:
+    """Event list with lookup tables built once at load time"""
+    
+    def __init__(self, events, version=0):
+        # Dict rows (tests, benchmarks, loaders) become Event records; Events are shared as-is
+        self.events = [e if isinstance(e, Event) else Event.from_dict(e) for e in events]
+        self.version = version
+        self.by_id = {}
+        self.by_mood = {}
+        self.by_category = {}
+        self.by_date = {}
+        self._position = {}
+        
+        for position, event in enumerate(self.events):
+            event_id = event.id
+            self.by_id[event_id] = event
+            self._position[event_id] = position
+            mask = event.mood_mask
+            while mask:
+                bit = mask & -mask
+                self.by_mood.setdefault(_mood_names[bit], []).append(event_id)
+                mask ^= bit
+            self.by_category.setdefault(event.category, []).append(event_id)
+            self.by_date.setdefault(event.date, []).append(event_id)
+        
+        # ISO dates sort chronologically, so date ranges are a bisect away
+        self._dates = sorted(self.by_date)
+        self._day_numbers = {day: _day_number(day) for day in self._dates}
+        self._max_seats = max((event.available_seats for event in self.events), default=0)
+        self._columns = None
+        self._columns_lock = threading.Lock()
+        self._bonus = (None, None)  # (today, per-event seat + date bonus) for the vectorized ranker
+    
+    def __len__(self):
+        return len(self.events)
+    
+    def get(self, event_id):
+        """Return the event with this id, or None"""
+        return self.by_id.get(event_id)
+    
+    def _resolve(self, ids, limit=None):
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.by_id[event_id] for event_id in ids]
+    
+    def events_for_mood(self, mood, limit=None):
+        """Events tagged with a mood, in catalog order"""
+        return self._resolve(self.by_mood.get(mood, []), limit)
+    
+    def events_for_category(self, category, limit=None):
+        """Events in a category, in catalog order"""
+        return self._resolve(self.by_category.get(category, []), limit)
+    
+    def events_on(self, date, limit=None):
+        """Events on a YYYY-MM-DD date, in catalog order"""
+        return self._resolve(self.by_date.get(date, []), limit)
+    
+    def events_between(self, start, end, limit=None):
+        """Events dated from start to end inclusive, in date order"""
+        ids = []
+        for date in self._dates[bisect_left(self._dates, start):bisect_right(self._dates, end)]:
+            ids.extend(self.by_date[date])
+        return self._resolve(ids, limit)
+    
+    def rank_by_moods(self, moods, limit=6, today=None, seats=None):
+        """Rank events by moods matched, then by seats left and how soon they are
+        
+        moods is a list of (mood, score) pairs as returned by detect_moods, or
+        plain mood strings; each matched mood counts once. Events that match
+        none are left out. Ties keep catalog order. seats, if given, returns live
+        counts for a list of ids as {event_id: seats} (SeatInventory.available_many);
+        the seat bonus then uses them and sold-out events are left out. Without
+        it the listed available_seats are used.
+        """
+        query = 0
+        for mood in moods:
+            mood = mood if isinstance(mood, str) else mood[0]
+            if mood in self.by_mood:
+                query |= _mood_bits[mood]
+        if not query or limit <= 0:
+            return []
+        
+        today = (today or date.today()).toordinal()
+        if seats is not None:
+            ids = self._rank_live(query, limit, today, seats)
+        else:
+            ids = self._ranked_ids(query, limit, today)
+        return [self.by_id[event_id] for event_id in ids]
+    
+    def _ranked_ids(self, query, limit, today):
+        columns = self._rank_columns()
+        if columns is not None:
+            return self._rank_vectorized(columns, query, limit, today)
+        return self._rank_postings(query, limit, today)
+    
+    def _rank_live(self, query, limit, today, seats):
+        """Rescore the listed-seat ranking with live seat counts, a growing batch at a time
+        
+        Live counts don't exceed listed ones, so an event's listed score bounds
+        its live score: once the top k outscore the first event not yet
+        rescored, no later event can displace them.
+        """
+        batch = limit * 4
+        while True:
+            ids = self._ranked_ids(query, batch + 1, today)
+            live = seats(ids[:batch])
+            scored = []
+            for event_id in ids[:batch]:
+                event = self.by_id[event_id]
+                left = live.get(event_id, event.available_seats)
+                if left > 0:
+                    scored.append((self._event_score(event, query, today, left), -self._position[event_id], event_id))
+            top = heapq.nlargest(limit, scored)
+            if (len(ids) <= batch or batch >= RANK_LIVE_MAX_CANDIDATES
+                    or (len(top) == limit and top[-1][0] > self._event_score(self.by_id[ids[batch]], query, today))):
+                return [event_id for _, _, event_id in top]
+            batch = min(batch * 2, RANK_LIVE_MAX_CANDIDATES)
+    
+    def _event_score(self, event, query, today, seats=None):
+        return (event.mood_mask & query).bit_count() + self._event_bonus(event, today, seats)
+    
+    def _event_bonus(self, event, today, seats=None):
+        if seats is None:
+            seats = event.available_seats
+        seats = min(1.0, seats / self._max_seats) if self._max_seats > 0 else 0.0
+        day = self._day_numbers.get(event.date)
+        ahead = day - today if day is not None else -1
+        soon = max(0.0, 1.0 - ahead / RANK_DATE_HORIZON_DAYS) if ahead >= 0 else 0.0
+        return RANK_SEAT_WEIGHT * seats + RANK_DATE_WEIGHT * soon
+    
+    def _rank_postings(self, query, limit, today):
+        """Score only the events in the query's mood posting lists"""
+        candidates = set()
+        mask = query
+        while mask:
+            bit = mask & -mask
+            candidates.update(self.by_mood[_mood_names[bit]])
+            mask ^= bit
+        position = self._position
+        scored = (
+            (self._event_score(self.by_id[event_id], query, today), -position[event_id], event_id)
+            for event_id in candidates
+        )
+        return [event_id for _, _, event_id in heapq.nlargest(limit, scored)]
+    
+    def _rank_columns(self):
+        """Mood masks, listed seats and day numbers as NumPy arrays, or None to rank with posting lists"""
+        if self._columns is None:
+            if not HAS_NUMPY or len(self.events) < VECTOR_RANK_MIN_EVENTS:
+                return None
+            with self._columns_lock:
+                if self._columns is None:
+                    import numpy as np  # several ms to import; only large catalogs need it
+                    
+                    count = len(self.events)
+                    # One row of uint64 words per 64 moods: moods outside MOODS take bits past 64
+                    width = len(_mood_bits)
+                    masks = np.empty(((width + 63) // 64, count), np.uint64)
+                    for word in range(len(masks)):
+                        shift = 64 * word
+                        masks[word] = np.fromiter(
+                            ((event.mood_mask >> shift) & _WORD for event in self.events), np.uint64, count
+                        )
+                    seats = np.fromiter((event.available_seats for event in self.events), np.float64, count)
+                    days = np.fromiter(
+                        (self._day_numbers.get(event.date) or 0 for event in self.events), np.int64, count
+                    )
+                    ids = np.fromiter((event.id for event in self.events), np.int64, count)
+                    if self._max_seats > 0:
+                        seats /= self._max_seats
+                    self._columns = (np, masks, seats, days, ids)
+        return self._columns
+    
+    def _rank_vectorized(self, columns, query, limit, today):
+        """Score every event at once: popcount(mask & query) + bonus, then argpartition for the top k"""
+        np, masks, seats, days, ids = columns
+        cached_today, bonus = self._bonus
+        if cached_today != today:
+            ahead = days - today  # undated events have day 0, far in the past
+            soon = np.where(ahead >= 0, np.clip(1.0 - ahead / RANK_DATE_HORIZON_DAYS, 0.0, 1.0), 0.0)
+            bonus = RANK_SEAT_WEIGHT * seats + RANK_DATE_WEIGHT * soon
+            self._bonus = (today, bonus)
+        
+        counts = None
+        for word in range(len(masks)):
+            bits = (query >> 64 * word) & _WORD
+            if not bits:
+                continue
+            matched = masks[word] & np.uint64(bits)
+            if hasattr(np, "bitwise_count"):  # NumPy 2
+                matched = np.bitwise_count(matched)
+            else:
+                matched = sum((matched >> np.uint64(bit)) & np.uint64(1)
+                              for bit in range(bits.bit_length()) if bits >> bit & 1)
+            counts = matched if counts is None else counts + matched
+        
+        # Bonuses are under 1, so the top k come from the fewest best match counts
+        # that hold k events; only those get scored and partitioned
+        tier = int(counts.max())
+        candidates = np.flatnonzero(counts >= tier)
+        while len(candidates) < limit and tier > 1:
+            tier -= 1
+            candidates = np.flatnonzero(counts >= tier)
+        if tier < 1:
+            return []
+        scores = counts[candidates] + bonus[candidates]
+        
+        if limit < len(scores):
+            cutoff = scores[np.argpartition(scores, len(scores) - limit)[-limit]]
+            # Everything above the cutoff, then the earliest events tied with it, like the posting-list ranker
+            top = np.flatnonzero(scores > cutoff)
+            top = np.concatenate((top, np.flatnonzero(scores == cutoff)[:limit - len(top)]))
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((top, -scores[top]))]  # best first, then catalog order
+        return ids[candidates[top]].tolist()
+
+
+_WORD = (1 << 64) - 1
+
+
+def _day_number(day):
+    """Proleptic ordinal of a YYYY-MM-DD string, or None if it is not a date"""
+    try:
+        return date.fromisoformat(day).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def get_catalog_version():
+    """Return the current catalog version"""
+    return _catalog_version
+
+
+def mark_catalog_changed():
+    """Signal that EVENTS was modified so cached derivatives get rebuilt"""
+    global _catalog_version
+    with _catalog_lock:
+        _catalog_version = next(_versions)
+        return _catalog_version
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_reload_listeners = []
+
+
+def get_catalog():
+    """Return the EventCatalog for the current catalog version, rebuilding it after changes
+    
+    A catalog is never modified once built: changes and reloads build a new
+    one and swap it in, so code holding a catalog sees one consistent snapshot.
+    """
+    global _catalog
+    catalog = _catalog
+    if catalog is None or catalog.version != _catalog_version:
+        with _catalog_lock:
+            catalog = _catalog
+            if catalog is None or catalog.version != _catalog_version:
+                if catalog is None and EVENTS_FILE:
+                    if CATALOG_POLL_SECONDS > 0:
+                        get_catalog_watcher()  # stats the file before it is read, so no edit is missed
+                    EVENTS[:] = _read_events_file(EVENTS_FILE)
+                catalog = _prepare(EventCatalog(EVENTS, version=_catalog_version))
+                _catalog = catalog
+    return catalog
+
+
+def _prepare(catalog):
+    """Build a new catalog's rank arrays and run the reload listeners, before any session can see it"""
+    catalog._rank_columns()
+    for callback in list(_reload_listeners):
+        callback(catalog)
+    return catalog
+
+
+def on_catalog_reload(callback):
+    """Call callback(catalog) with each new catalog (first load, change or reload) before sessions can see it
+    
+    Runs on the loading thread with the catalog's final version already set,
+    so derived data (indexes, seat stock) can be ready by the time it is swapped in.
+    """
+    _reload_listeners.append(callback)
+    return callback
+
+
+def reload_catalog(path=None):
+    """Read the events file into a new catalog and swap it in; returns the new catalog
+    
+    The events and indexes are built off to the side while sessions keep
+    using the current catalog; the swap itself is a single assignment.
+    """
+    global _catalog, _catalog_version
+    events = _read_events_file(path or EVENTS_FILE)
+    catalog = _prepare(EventCatalog(events, version=next(_versions)))
+    with _catalog_lock:
+        if catalog.version > _catalog_version:  # a later change may have landed while this one was built
+            _catalog_version = catalog.version
+            EVENTS[:] = events
+            _catalog = catalog
+    return catalog
+
+
+def _read_events_file(path):
+    """Events from a catalog file; ValueError for an empty one, which would leave sessions nothing to offer"""
+    from event_store import load_events  # event_store builds on this module
+    
+    events = load_events(path)
+    if not events:
+        raise ValueError(f"{path} holds no events")
+    return events
+
+
+class CatalogWatcher:
+    """Polls the events file and reloads the catalog on a background thread when it changes"""
+    
+    def __init__(self, path, interval=CATALOG_POLL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self.failures = 0
+        # A change is loaded once two polls in a row see the same stamp, so a file
+        # still being written in place is not read half way through
+        self._loaded = self._seen = self._stamp()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+    
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+    
+    def check(self):
+        """Reload if the file changed and has settled since the last check; returns the new catalog or None"""
+        stamp = self._stamp()
+        settled = stamp == self._seen
+        self._seen = stamp
+        if stamp is None or stamp == self._loaded or not settled:
+            return None
+        self._loaded = stamp
+        try:
+            catalog = reload_catalog(self.path)
+        except Exception as e:  # a bad file or listener must not stop the watcher thread
+            self.failures += 1
+            print(f"Catalog reload from {self.path} failed, still serving version {get_catalog_version()}: {e}")
+            return None
+        self.reloads += 1
+        return catalog
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_catalog_watcher():
+    """The process-wide CatalogWatcher for EVENTS_FILE, started on first use"""
+    global _watcher
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = CatalogWatcher(EVENTS_FILE).start()
+    return _watcher
+
+
+# Build the indexes at load time; a catalog file is read on first use instead
+if not EVENTS_FILE:
+    get_catalog()
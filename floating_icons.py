@@ -0,0 +1,100 @@
+"""
+Floating Icons - Decorative retro icons for the app background
+The icon JPEGs are downscaled and recompressed to the largest width they are
+displayed at, once per process (and again only if a source file changes).
+With Streamlit static serving enabled they are written to static/icons and
+referenced by URL so browsers cache them; otherwise they are inlined.
+"""
+
+import base64
+import io
+import os
+
+import streamlit as st
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ICONS_FOLDER = os.path.join(APP_DIR, "icons new")
+STATIC_ICONS_FOLDER = os.path.join(APP_DIR, "static", "icons")
+
+ICON_FILES = [
+    "books.jpeg",
+    "download (1).jpeg",
+    "download (2).jpeg",
+    "Download premium png of PNG Retro cassette tape illustration_ by Hein about music png, cassett tape halftone, vintage paper background, vintage cassette tape illustration, and background 17874012.jpeg",
+    "Download premium png of PNG Vintage monochrome globe illustration by Hein about globe, retro world map, world, background, and png 17873929.jpeg",
+    "download.jpeg"
+]
+
+# 12 icons spread around, using images in varied order to avoid same icons near each other
+ICON_ORDER = [0, 3, 1, 4, 2, 5, 2, 0, 4, 1, 5, 3]
+
+# CSS width of each .icon-N slot in app.py, in the same order
+ICON_SLOT_WIDTHS = [130, 95, 85, 115, 75, 100, 70, 95, 65, 90, 60, 85]
+
+ICON_JPEG_QUALITY = 80
+
+
+def icon_path(icon_idx):
+    return os.path.join(ICONS_FOLDER, ICON_FILES[icon_idx])
+
+
+def icon_mtimes():
+    """Modification time of each icon file (None if missing), used as the cache key"""
+    return tuple(
+        os.path.getmtime(icon_path(i)) if os.path.exists(icon_path(i)) else None
+        for i in range(len(ICON_FILES))
+    )
+
+
+def display_widths():
+    """Largest width each icon file is shown at"""
+    widths = {}
+    for slot, icon_idx in enumerate(ICON_ORDER):
+        widths[icon_idx] = max(widths.get(icon_idx, 0), ICON_SLOT_WIDTHS[slot])
+    return widths
+
+
+def shrink_icon(path, width):
+    """Downscale and recompress an icon to JPEG bytes at the given width"""
+    from PIL import Image  # only needed the first time a process builds the icons
+    
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        if img.width > width:
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=ICON_JPEG_QUALITY, optimize=True)
+        return buffer.getvalue()
+
+
+def build_floating_icons_html(mtimes, static_serving):
+    """<img> tags for all floating icons, with URLs (static serving) or inline data URIs"""
+    sources = {}
+    for icon_idx, width in display_widths().items():
+        if mtimes[icon_idx] is None:
+            continue
+        data = shrink_icon(icon_path(icon_idx), width)
+        if static_serving:
+            os.makedirs(STATIC_ICONS_FOLDER, exist_ok=True)
+            name = f"icon-{icon_idx}.jpg"
+            with open(os.path.join(STATIC_ICONS_FOLDER, name), "wb") as f:
+                f.write(data)
+            # The version query makes browsers refetch after an icon changes
+            sources[icon_idx] = f"app/static/icons/{name}?v={int(mtimes[icon_idx])}"
+        else:
+            sources[icon_idx] = "data:image/jpeg;base64," + base64.b64encode(data).decode()
+
+    return "".join(
+        f'<img src="{sources[icon_idx]}" class="floating-icon icon-{i+1}" />'
+        for i, icon_idx in enumerate(ICON_ORDER) if icon_idx in sources
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_floating_icons_html(mtimes, static_serving):
+    return build_floating_icons_html(mtimes, static_serving)
+
+
+def get_floating_icons_html():
+    """Floating icons HTML, built once per process and rebuilt if an icon file changes"""
+    return _cached_floating_icons_html(icon_mtimes(), bool(st.get_option("server.enableStaticServing")))
@@ -0,0 +1,192 @@
+"""
+Seat Inventory - Atomic seat reservations shared across sessions and processes
+Backed by a local SQLite database in WAL mode so every Streamlit session and
+every server process on the host sees the same seat counts
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from events_data import get_catalog, on_catalog_reload
+
+DEFAULT_DB_PATH = os.environ.get("TICKETBOT_INVENTORY_DB", "inventory.db")
+
+# Seats held at the ticket_count step are returned if the booking isn't confirmed in time
+HOLD_TTL_SECONDS = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seats (
+    event_id INTEGER PRIMARY KEY,
+    available INTEGER NOT NULL CHECK (available >= 0)
+);
+CREATE TABLE IF NOT EXISTS holds (
+    hold_id TEXT PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    seats INTEGER NOT NULL CHECK (seats > 0),
+    expires_at REAL NOT NULL,
+    confirmed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS holds_pending ON holds (confirmed, expires_at);
+"""
+
+
+class SeatInventory:
+    """Seat counts with atomic reserve / confirm / release operations"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, hold_ttl=HOLD_TTL_SECONDS):
+        self.path = path
+        self.hold_ttl = hold_ttl
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        """One connection per thread; SQLite handles locking across threads and processes"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=30000")
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    def seed(self, events):
+        """Load starting seat counts for events not yet in the store"""
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO seats (event_id, available) VALUES (?, ?)",
+                ((e["id"], e["available_seats"]) for e in events)
+            )
+
+    def _expire(self, db, now):
+        """Return seats from expired, unconfirmed holds"""
+        db.execute(
+            """UPDATE seats SET available = available + (
+                   SELECT SUM(h.seats) FROM holds h
+                   WHERE h.event_id = seats.event_id AND h.confirmed = 0 AND h.expires_at < ?)
+               WHERE event_id IN (SELECT event_id FROM holds WHERE confirmed = 0 AND expires_at < ?)""",
+            (now, now)
+        )
+        return db.execute("DELETE FROM holds WHERE confirmed = 0 AND expires_at < ?", (now,)).rowcount
+
+    def expire_holds(self):
+        """Release every expired hold now; returns how many were released"""
+        with self._transaction() as db:
+            return self._expire(db, time.time())
+
+    def available(self, event_id):
+        """Seats currently available for an event, or None if it isn't stocked"""
+        return self.available_many([event_id]).get(event_id)
+
+    def available_many(self, event_ids):
+        """Seats currently available for several events as {event_id: seats}"""
+        event_ids = list(event_ids)
+        if not event_ids:
+            return {}
+        # A plain read, so listings never wait on or block bookings. Seats in expired
+        # holds count as available; reserve and confirm return them to the seats table
+        placeholders = ",".join("?" * len(event_ids))
+        rows = self._connect().execute(
+            f"""SELECT event_id, available + COALESCE((
+                    SELECT SUM(h.seats) FROM holds h
+                    WHERE h.event_id = seats.event_id AND h.confirmed = 0 AND h.expires_at < ?), 0)
+                FROM seats WHERE event_id IN ({placeholders})""",
+            (time.time(), *event_ids)
+        )
+        return dict(rows.fetchall())
+
+    def reserve(self, event_id, n):
+        """Atomically hold n seats; returns a hold ID, or None if not enough seats are left"""
+        if n <= 0:
+            return None
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            # The guarded UPDATE is the reservation: it can never take the count below zero
+            taken = db.execute(
+                "UPDATE seats SET available = available - ? WHERE event_id = ? AND available >= ?",
+                (n, event_id, n)
+            ).rowcount
+            if not taken:
+                return None
+            hold_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO holds (hold_id, event_id, seats, expires_at) VALUES (?, ?, ?, ?)",
+                (hold_id, event_id, n, now + self.hold_ttl)
+            )
+            return hold_id
+
+    def confirm(self, hold_id):
+        """Turn a pending hold into a sale; returns False if it expired or is unknown"""
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            return db.execute(
+                "UPDATE holds SET confirmed = 1 WHERE hold_id = ? AND confirmed = 0",
+                (hold_id,)
+            ).rowcount == 1
+
+    def release(self, hold_id):
+        """Give a pending hold's seats back; confirmed sales are left alone"""
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT event_id, seats FROM holds WHERE hold_id = ? AND confirmed = 0",
+                (hold_id,)
+            ).fetchone()
+            if not row:
+                return False
+            db.execute("DELETE FROM holds WHERE hold_id = ?", (hold_id,))
+            db.execute("UPDATE seats SET available = available + ? WHERE event_id = ?", (row[1], row[0]))
+            return True
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolling back on error"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        # IMMEDIATE takes the write lock up front so check-and-decrement can't interleave
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+_inventory = None
+_inventory_version = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory():
+    """Process-wide SeatInventory, stocked with any events added to the catalog"""
+    global _inventory, _inventory_version
+    catalog = get_catalog()
+    if _inventory is not None and _inventory_version == catalog.version:
+        return _inventory
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = SeatInventory()
+        if _inventory_version != catalog.version:
+            _inventory.seed(catalog.events)
+            _inventory_version = catalog.version
+    return _inventory
+
+
+@on_catalog_reload
+def _stock_reloaded_events(catalog):
+    """Seed events added by a catalog reload before any session can pick them"""
+    global _inventory_version
+    with _inventory_lock:
+        if _inventory is not None:
+            _inventory.seed(catalog.events)
+            _inventory_version = catalog.version
@@ -0,0 +1,133 @@
+"""
+LLM Response Cache - Reuses replies to the chatbot's deterministic prompts
+Entries are keyed on the prompt template and its variables, expire after a TTL,
+and are evicted least-recently-used. Each key keeps a small pool of variants so
+cached replies don't repeat word for word. An optional SQLite file keeps the
+cache across restarts.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_TTL_SECONDS = int(os.environ.get("TICKETBOT_LLM_CACHE_TTL", str(6 * 3600)))
+CACHE_MAX_KEYS = int(os.environ.get("TICKETBOT_LLM_CACHE_MAX_KEYS", "2048"))
+CACHE_VARIANTS = int(os.environ.get("TICKETBOT_LLM_CACHE_VARIANTS", "3"))
+CACHE_DB_PATH = os.environ.get("TICKETBOT_LLM_CACHE_DB")  # unset = memory only
+
+
+class LLMResponseCache:
+    """TTL + LRU cache holding up to `variants` replies per prompt key"""
+
+    def __init__(self, max_keys=CACHE_MAX_KEYS, ttl=CACHE_TTL_SECONDS, variants=CACHE_VARIANTS, path=None):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.variants = variants
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> [(created_at, text), ...]
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._open_db(path)
+
+    @staticmethod
+    def make_key(template, *variables):
+        """Normalized cache key for a prompt template and its variables"""
+        return json.dumps([template, *variables], separators=(",", ":"))
+
+    def _open_db(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_key ON llm_cache (key)")
+        cutoff = time.time() - self.ttl
+        self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+        for key, text, created_at in self._db.execute("SELECT key, text, created_at FROM llm_cache ORDER BY created_at"):
+            pool = self._entries.setdefault(key, [])
+            pool.append((created_at, text))
+            del pool[:-self.variants]
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    def _fresh_pool(self, key, now):
+        """Variants for key that are still within the TTL (caller holds the lock)"""
+        pool = self._entries.get(key)
+        if pool is None:
+            return None
+        pool[:] = [(created_at, text) for created_at, text in pool if now - created_at < self.ttl]
+        if not pool:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return pool
+
+    def get(self, key):
+        """A cached reply for key, or None while its variant pool is still filling"""
+        with self._lock:
+            pool = self._fresh_pool(key, time.time())
+            if pool and len(pool) >= self.variants:
+                self.hits += 1
+                return random.choice(pool)[1]
+            self.misses += 1
+            return None
+
+    def needs_fill(self, key):
+        """True while key has fewer than `variants` fresh replies"""
+        with self._lock:
+            pool = self._fresh_pool(key, time.time())
+            return not pool or len(pool) < self.variants
+
+    def put(self, key, text):
+        """Add a reply to key's variant pool"""
+        if not text:
+            return
+        now = time.time()
+        with self._lock:
+            pool = self._fresh_pool(key, now)
+            if pool is None:
+                pool = self._entries[key] = []
+            if len(pool) >= self.variants:
+                return
+            pool.append((now, text))
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            if self._db is not None:
+                self._db.execute("INSERT INTO llm_cache (key, text, created_at) VALUES (?, ?, ?)", (key, text, now))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        """Hit/miss counters and size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "keys": len(self._entries),
+                "replies": sum(len(pool) for pool in self._entries.values())
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide LLMResponseCache, persisted to TICKETBOT_LLM_CACHE_DB when set"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(path=CACHE_DB_PATH)
+    return _cache
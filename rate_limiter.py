@@ -0,0 +1,248 @@
+"""
+Rate Limiter - Process-wide token buckets in front of every Groq call
+Requests wait in a priority queue until both the requests-per-minute and the
+tokens-per-minute buckets can cover them, so interactive turns go ahead of
+cache pre-warming and sessions stop hitting 429s all at once. A 429 pauses
+the whole queue for the server's retry-after (or a jittered backoff).
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+# 0 disables a bucket; set these to the account's Groq quotas
+REQUESTS_PER_MINUTE = float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.environ.get("GROQ_TOKENS_PER_MINUTE", "0"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREWARM = 10
+
+# Share of each bucket that lower-priority requests leave untouched, so a pre-warm
+# burst can't drain the quota just before users arrive
+BACKGROUND_RESERVE = float(os.environ.get("GROQ_BACKGROUND_RESERVE", "0.5"))
+
+# Retries of a failed request, and the exponential backoff used when there is no retry-after header
+MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number `attempt` (0-based)
+
+    The server's retry-after wins, plus up to 10% jitter so waiting sessions
+    don't all retry in the same instant; otherwise full-jitter exponential backoff.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 0.1 * retry_after)
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class TokenBucket:
+    """Refills `limit` units every `period` seconds, holding at most `limit`"""
+
+    def __init__(self, limit, period=60.0):
+        self.capacity = limit
+        self.rate = limit / period
+        self.level = limit
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount, now, reserve=0.0):
+        """Seconds until `amount` is available on top of a `reserve` share of capacity (0 if it is now)"""
+        self._refill(now)
+        # A request bigger than the whole bucket waits for a full bucket rather than forever
+        amount = min(amount + reserve * self.capacity, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "wake")
+
+    def __init__(self, priority, seq, tokens, wake):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.wake = wake
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimiter:
+    """Priority queue in front of request and token buckets, usable from threads and event loops"""
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE, period=60.0,
+                 background_reserve=BACKGROUND_RESERVE):
+        # period only changes for simulations that compress a minute of quota into a few seconds
+        self.requests = TokenBucket(requests_per_minute, period) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, period) if tokens_per_minute > 0 else None
+        self.background_reserve = background_reserve
+        self._lock = threading.Lock()
+        self._queue = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._waits = {}  # priority -> [count, total seconds, max seconds]
+        self.peak_queue_depth = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    @property
+    def enabled(self):
+        return self.requests is not None or self.tokens is not None
+
+    def _grant_delay(self, waiter, now):
+        """Take capacity for the head waiter and return 0, or return how long it must wait (lock held)"""
+        delay = self._paused_until - now
+        reserve = self.background_reserve if waiter.priority > PRIORITY_INTERACTIVE else 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now, reserve))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(waiter.tokens, now, reserve))
+        if delay > 0:
+            return delay
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(waiter.tokens)
+        heapq.heappop(self._queue)
+        if self._queue:
+            self._queue[0].wake()
+        return 0.0
+
+    def _enqueue(self, tokens, priority, wake):
+        waiter = _Waiter(priority, next(self._seq), tokens, wake)
+        heapq.heappush(self._queue, waiter)
+        self.peak_queue_depth = max(self.peak_queue_depth, len(self._queue))
+        if self._queue[0] is waiter:
+            waiter.wake()
+        return waiter
+
+    def _leave(self, waiter):
+        """Drop a waiter that gave up (lock held)"""
+        if waiter in self._queue:
+            was_head = self._queue[0] is waiter
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            if was_head and self._queue:
+                self._queue[0].wake()
+
+    def _record_wait(self, priority, seconds):
+        entry = self._waits.setdefault(priority, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def acquire(self, tokens=1, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Block until the request may be sent; False if `timeout` seconds pass first"""
+        if not self.enabled and time.monotonic() >= self._paused_until:
+            return True
+        start = time.monotonic()
+        event = threading.Event()
+        with self._lock:
+            waiter = self._enqueue(tokens, priority, event.set)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    delay = self._grant_delay(waiter, now) if self._queue[0] is waiter else None
+                    if delay == 0:
+                        self._record_wait(priority, now - start)
+                        return True
+                    event.clear()
+                if timeout is not None:
+                    remaining = start + timeout - now
+                    if remaining <= 0:
+                        return False
+                    delay = remaining if delay is None else min(delay, remaining)
+                event.wait(delay)
+        finally:
+            with self._lock:
+                self._leave(waiter)
+
+    async def acquire_async(self, tokens=1, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Await until the request may be sent; False if `timeout` seconds pass first"""
+        if not self.enabled and time.monotonic() >= self._paused_until:
+            return True
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        with self._lock:
+            waiter = self._enqueue(tokens, priority, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    delay = self._grant_delay(waiter, now) if self._queue[0] is waiter else None
+                    if delay == 0:
+                        self._record_wait(priority, now - start)
+                        return True
+                    event.clear()
+                if timeout is not None:
+                    remaining = start + timeout - now
+                    if remaining <= 0:
+                        return False
+                    delay = remaining if delay is None else min(delay, remaining)
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._leave(waiter)
+
+    def refund(self, tokens):
+        """Return tokens reserved for a request that used fewer, or failed"""
+        if self.tokens is not None and tokens > 0:
+            with self._lock:
+                self.tokens.give_back(tokens)
+                if self._queue:
+                    self._queue[0].wake()
+
+    def pause(self, seconds, retrying=True):
+        """Hold every queued request for `seconds` after the server rate limited us"""
+        with self._lock:
+            self.rate_limited += 1
+            self.retries += retrying
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        """Queue depth and wait times per priority"""
+        with self._lock:
+            return {
+                "queue_depth": len(self._queue),
+                "peak_queue_depth": self.peak_queue_depth,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "waits": {
+                    priority: {"count": count, "mean_ms": total / count * 1000, "max_ms": longest * 1000}
+                    for priority, (count, total, longest) in self._waits.items()
+                }
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide RateLimiter configured from GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
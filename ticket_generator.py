@@ -1,16 +1,25 @@
 """
 QR Code Ticket Generator - Creates unique QR tickets for bookings
-Optimizes images using ScaleDown API for better performance
+Optimizes images in the background (ScaleDown API, or Pillow offline) and
+serves the optimized copy once it is ready
+
+qrcode, PIL and requests are imported by the functions that use them, so
+importing this module (e.g. for generate_ticket_id) stays cheap until a
+ticket is actually rendered.
 """
 
-import qrcode
-from PIL import Image, ImageDraw
 import io
+import argparse
 import hashlib
+import json
+import time
+from collections import OrderedDict
 from datetime import datetime
 import os
-import requests
 import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Try to import streamlit for secrets (deployment)
 try:
@@ -19,6 +28,60 @@ try:
 except ImportError:
     HAS_STREAMLIT = False
 
+# Rendered PNGs kept per process; a Streamlit rerun becomes a dictionary lookup
+RENDER_CACHE_SIZE = 256
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry past max_size"""
+    
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
+_render_cache = LRUCache(RENDER_CACHE_SIZE)
+
+# Pixels per QR module in the full-size preview
+QR_BOX_SIZE = 10
+
+# Ticket pages decoded and written per step of a PDF batch
+PDF_PAGES_PER_WRITE = 32
+
+# "auto" uses ScaleDown when SCALEDOWN_API_KEY is set and the local Pillow optimizer
+# otherwise; "scaledown", "local" or "off" pick one explicitly
+IMAGE_OPTIMIZER = os.environ.get("TICKETBOT_IMAGE_OPTIMIZER", "auto")
+OPTIMIZER_WORKERS = int(os.environ.get("TICKETBOT_OPTIMIZER_WORKERS", "4"))
+# Images waiting for the pool past this are served unoptimized rather than queued
+OPTIMIZER_MAX_PENDING = int(os.environ.get("TICKETBOT_OPTIMIZER_MAX_PENDING", "64"))
+
+# Optimized PNGs keyed by the SHA-1 of the rendered PNG
+_optimized_cache = LRUCache(RENDER_CACHE_SIZE * 2)
+_optimizing = {}  # content hash -> Future
+_optimizer_lock = threading.Lock()
+_optimizer_pool = None
+_optimizer_pool_lock = threading.Lock()
+
 def _get_scaledown_api_key():
     """Get ScaleDown API key from Streamlit secrets or environment"""
     if HAS_STREAMLIT:
@@ -30,11 +93,13 @@ def _get_scaledown_api_key():
     return os.environ.get("SCALEDOWN_API_KEY")
 
 def optimize_image_with_scaledown(image_bytes, image_format="PNG"):
-    """Optimize image using ScaleDown API (non-blocking background task)"""
+    """Optimize PNG bytes using ScaleDown API; returns the original bytes if that fails"""
     api_key = _get_scaledown_api_key()
     if not api_key:
         return image_bytes
     
+    import requests
+    
     try:
         # Prepare the image data
         files = {'image': ('ticket.png', image_bytes, 'image/png')}
@@ -50,7 +115,7 @@ def optimize_image_with_scaledown(image_bytes, image_format="PNG"):
         
         if response.status_code == 200:
             # Return optimized image bytes
-            return io.BytesIO(response.content)
+            return response.content
         else:
             # If optimization fails, return original
             print(f"ScaleDown optimization skipped: {response.status_code}")
@@ -60,19 +125,95 @@ def optimize_image_with_scaledown(image_bytes, image_format="PNG"):
         print(f"ScaleDown API error (non-blocking): {e}")
         return image_bytes
 
+def optimize_png_locally(image_bytes):
+    """Optimize PNG bytes offline with Pillow: an exact palette where possible, then optimize=True"""
+    from PIL import Image
+    
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if image.mode != "1":
+            rgb = image.convert("RGB")
+            colors = rgb.getcolors(256)
+            # Up to 256 colours fit a palette losslessly; beyond that, quantize without dithering
+            image = rgb.quantize(
+                len(colors) if colors else 256,
+                method=Image.Quantize.MEDIANCUT if colors else Image.Quantize.FASTOCTREE,
+                dither=Image.Dither.NONE
+            )
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(image_bytes) else image_bytes
+
+def _image_optimizer():
+    """Backend function for IMAGE_OPTIMIZER, or None when optimization is off"""
+    if IMAGE_OPTIMIZER == "off":
+        return None
+    if IMAGE_OPTIMIZER == "scaledown" or (IMAGE_OPTIMIZER == "auto" and _get_scaledown_api_key()):
+        return optimize_image_with_scaledown
+    return optimize_png_locally
+
+def get_optimizer_pool():
+    """Threads shared by all background image optimizations"""
+    global _optimizer_pool
+    if _optimizer_pool is None:
+        with _optimizer_pool_lock:
+            if _optimizer_pool is None:
+                _optimizer_pool = ThreadPoolExecutor(max_workers=OPTIMIZER_WORKERS, thread_name_prefix="image-optimizer")
+    return _optimizer_pool
+
+def _optimize_job(optimizer, digest, image_bytes):
+    try:
+        optimized = optimizer(image_bytes)
+    except Exception as e:
+        print(f"Image optimization skipped: {e}")
+        optimized = image_bytes  # don't retry on every rerun
+    _optimized_cache.put(digest, optimized)
+    with _optimizer_lock:
+        _optimizing.pop(digest, None)
+
 def optimize_image_async(image_bytes):
-    """Optimize image in background thread"""
-    thread = threading.Thread(target=optimize_image_with_scaledown, args=(image_bytes,), daemon=True)
-    thread.start()
+    """Queue a PNG for background optimization on the shared pool; returns its content hash
+    
+    Takes bytes (a BytesIO is copied) so the worker never shares a stream with the caller.
+    """
+    if isinstance(image_bytes, io.BytesIO):
+        image_bytes = image_bytes.getvalue()
+    digest = hashlib.sha1(image_bytes).hexdigest()
+    optimizer = _image_optimizer()
+    if optimizer is None or _optimized_cache.get(digest) is not None:
+        return digest
+    with _optimizer_lock:
+        if digest not in _optimizing and len(_optimizing) < OPTIMIZER_MAX_PENDING:
+            _optimizing[digest] = get_optimizer_pool().submit(_optimize_job, optimizer, digest, image_bytes)
+    return digest
+
+def optimized_png(image_bytes):
+    """The optimized copy of a PNG if it is ready; otherwise queue it and return the PNG unchanged"""
+    optimized = _optimized_cache.get(optimize_image_async(image_bytes))
+    return optimized if optimized is not None else image_bytes
 
 def generate_ticket_id(booking_data):
     """Generate a unique ticket ID"""
-    unique_string = f"{booking_data['name']}{booking_data['event']}{booking_data['email']}{datetime.now().isoformat()}"
+    # The random part keeps identical group bookings minted in the same instant distinct
+    unique_string = f"{booking_data['name']}{booking_data['event']}{booking_data['email']}{datetime.now().isoformat()}{uuid.uuid4().hex}"
     return hashlib.md5(unique_string.encode()).hexdigest()[:12].upper()
 
-def generate_qr_code(booking_data):
-    """Generate QR code containing ticket information"""
-    ticket_id = generate_ticket_id(booking_data)
+def _ticket_id_for(booking_data):
+    """Use the ticket ID minted with the booking, or mint one for ad-hoc callers"""
+    return booking_data.get("ticket_id") or generate_ticket_id(booking_data)
+
+def _render_cache_key(booking_data):
+    """Cache key for a rendered ticket; None when the booking has no stable ticket ID"""
+    if not booking_data.get("ticket_id"):
+        return None
+    fields = "|".join(str(booking_data.get(k)) for k in ("ticket_id", "name", "email", "event", "date", "time", "venue", "tickets", "total"))
+    return hashlib.sha1(fields.encode()).hexdigest()
+
+def generate_qr_matrix(booking_data):
+    """Compute the QR module matrix (including the quiet zone) for a booking"""
+    import qrcode
+    
+    ticket_id = _ticket_id_for(booking_data)
     
     qr_data = f"""
 EVENT TICKET
@@ -92,19 +233,36 @@ Valid for entry
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
+        box_size=QR_BOX_SIZE,
         border=4,
     )
     qr.add_data(qr_data)
     qr.make(fit=True)
     
-    qr_image = qr.make_image(fill_color="#000000", back_color="#ffffff")
+    return qr.get_matrix(), ticket_id
+
+def qr_matrix_to_image(matrix, size=None):
+    """Draw a QR module matrix as a 1-bit image, QR_BOX_SIZE px per module or scaled to size px"""
+    from PIL import Image
     
-    return qr_image, ticket_id
+    modules = len(matrix)
+    pixels = bytes(0 if dark else 255 for row in matrix for dark in row)
+    image = Image.frombytes("L", (modules, modules), pixels).convert("1", dither=Image.Dither.NONE)
+    size = size or modules * QR_BOX_SIZE
+    # Nearest-neighbour keeps module edges sharp at any size
+    return image.resize((size, size), Image.Resampling.NEAREST)
 
-def create_ticket_image(booking_data):
+def generate_qr_code(booking_data):
+    """Generate QR code containing ticket information"""
+    matrix, ticket_id = generate_qr_matrix(booking_data)
+    return qr_matrix_to_image(matrix), ticket_id
+
+def create_ticket_image(booking_data, qr_matrix=None, ticket_id=None):
     """Create a complete ticket image with QR code"""
-    qr_image, ticket_id = generate_qr_code(booking_data)
+    from PIL import Image, ImageDraw
+    
+    if qr_matrix is None:
+        qr_matrix, ticket_id = generate_qr_matrix(booking_data)
     
     ticket_width = 600
     ticket_height = 350
@@ -125,9 +283,9 @@ def create_ticket_image(booking_data):
     # Title
     draw.text((60, 15), "EVENT TICKET", fill='#ffffff')
     
-    # Resize and paste QR code
+    # Draw the QR code straight from the module matrix at its final size
     qr_size = 140
-    qr_image = qr_image.resize((qr_size, qr_size))
+    qr_image = qr_matrix_to_image(qr_matrix, size=qr_size)
     qr_position = (ticket_width - qr_size - 30, 80)
     ticket.paste(qr_image, qr_position)
     
@@ -154,28 +312,143 @@ def create_ticket_image(booking_data):
     
     return ticket, ticket_id
 
+def _to_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def render_ticket_pngs(booking_data):
+    """Render the QR preview and full ticket PNGs from a single QR computation
+    
+    Returns (qr_png, ticket_png, ticket_id) with the PNGs as bytes.
+    """
+    matrix, ticket_id = generate_qr_matrix(booking_data)
+    qr_png = _to_png(qr_matrix_to_image(matrix))
+    ticket_image, _ = create_ticket_image(booking_data, matrix, ticket_id)
+    return qr_png, _to_png(ticket_image), ticket_id
+
+def _get_rendered_ticket(booking_data):
+    """Render a booking's PNGs once, serving repeats from the LRU cache"""
+    key = _render_cache_key(booking_data)
+    cached = _render_cache.get(key) if key else None
+    if cached:
+        return cached
+    
+    rendered = render_ticket_pngs(booking_data)
+    if key:
+        _render_cache.put(key, rendered)
+    return rendered
+
 def get_qr_bytes(booking_data):
-    """Get QR code as bytes for display in Streamlit"""
-    qr_image, ticket_id = generate_qr_code(booking_data)
+    """Get QR code as bytes for display in Streamlit (optimized once the background pass finishes)"""
+    qr_png, _, ticket_id = _get_rendered_ticket(booking_data)
+    return io.BytesIO(optimized_png(qr_png)), ticket_id
+
+def get_ticket_bytes(booking_data):
+    """Get complete ticket as bytes for download (optimized once the background pass finishes)"""
+    _, ticket_png, ticket_id = _get_rendered_ticket(booking_data)
+    return io.BytesIO(optimized_png(ticket_png)), ticket_id
+
+def _with_ticket_id(booking_data):
+    """Copy of a booking with a ticket ID, minting one if it has none yet"""
+    if booking_data.get("ticket_id"):
+        return booking_data
+    return dict(booking_data, ticket_id=generate_ticket_id(booking_data))
+
+def generate_tickets_batch(bookings, workers=None, ordered=True, chunksize=4):
+    """Render many bookings across a process pool
+    
+    Yields (index, ticket_id, qr_png, ticket_png) per booking, in input order
+    when ordered is True, otherwise as soon as each render completes.
+    workers=1 renders in this process without a pool.
+    """
+    bookings = [_with_ticket_id(b) for b in bookings]
     
-    img_bytes = io.BytesIO()
-    qr_image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    if workers == 1:
+        for index, booking in enumerate(bookings):
+            qr_png, ticket_png, ticket_id = render_ticket_pngs(booking)
+            yield index, ticket_id, qr_png, ticket_png
+        return
     
-    # Optimize in background (non-blocking)
-    optimize_image_async(img_bytes)
+    from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing; batch jobs only
     
-    return img_bytes, ticket_id
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if ordered:
+            results = pool.map(render_ticket_pngs, bookings, chunksize=chunksize)
+            for index, (qr_png, ticket_png, ticket_id) in enumerate(results):
+                yield index, ticket_id, qr_png, ticket_png
+        else:
+            futures = {pool.submit(render_ticket_pngs, b): i for i, b in enumerate(bookings)}
+            for future in as_completed(futures):
+                qr_png, ticket_png, ticket_id = future.result()
+                yield futures[future], ticket_id, qr_png, ticket_png
 
-def get_ticket_bytes(booking_data):
-    """Get complete ticket as bytes for download"""
-    ticket_image, ticket_id = create_ticket_image(booking_data)
+def _append_pdf_pages(output, pages, written):
+    """Write pages to a PDF, starting the file when nothing has been written yet"""
+    pages[0].save(output, format="PDF", save_all=True, append=written > 0, append_images=pages[1:])
+    for page in pages:
+        page.close()
+
+def write_tickets_batch(bookings, output, workers=None):
+    """Render bookings straight to disk: a .zip, a multi-page .pdf, or a directory of PNGs
     
-    img_bytes = io.BytesIO()
-    ticket_image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    Returns the number of tickets written.
+    """
+    count = 0
+    results = generate_tickets_batch(bookings, workers=workers, ordered=True)
+    
+    if output.lower().endswith(".zip"):
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+            # PNGs are already deflated, so storing them avoids a second compression pass
+            for _, ticket_id, qr_png, ticket_png in results:
+                archive.writestr(f"ticket_{ticket_id}.png", ticket_png)
+                archive.writestr(f"qr_{ticket_id}.png", qr_png)
+                count += 1
+    elif output.lower().endswith(".pdf"):
+        from PIL import Image
+        
+        # Pages are appended to the file a chunk at a time, so only one chunk is decoded at once
+        pages = []
+        for _, _, _, ticket_png in results:
+            pages.append(Image.open(io.BytesIO(ticket_png)))
+            if len(pages) == PDF_PAGES_PER_WRITE:
+                _append_pdf_pages(output, pages, count)
+                count += len(pages)
+                pages = []
+        if pages:
+            _append_pdf_pages(output, pages, count)
+            count += len(pages)
+    else:
+        os.makedirs(output, exist_ok=True)
+        for _, ticket_id, qr_png, ticket_png in results:
+            with open(os.path.join(output, f"ticket_{ticket_id}.png"), "wb") as f:
+                f.write(ticket_png)
+            with open(os.path.join(output, f"qr_{ticket_id}.png"), "wb") as f:
+                f.write(qr_png)
+            count += 1
     
-    # Optimize in background (non-blocking)
-    optimize_image_async(img_bytes)
+    return count
+
+def _load_bookings(path):
+    """Read bookings from a JSON list or a JSON Lines file"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def main(argv=None):
+    """Command line entry point for batch ticket generation"""
+    parser = argparse.ArgumentParser(description="Render QR tickets for many bookings at once.")
+    parser.add_argument("bookings", help="JSON list or JSON Lines file of booking dicts (see get_booking_data)")
+    parser.add_argument("output", help="output .zip, .pdf, or directory for PNG files")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
     
-    return img_bytes, ticket_id
+    start = time.perf_counter()
+    count = write_tickets_batch(_load_bookings(args.bookings), args.output, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} tickets to {args.output} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f} tickets/s)")
+
+if __name__ == "__main__":
+    main()